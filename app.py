@@ -5,27 +5,77 @@ Flask web interface for Guess That Official Game
 Team-friendly government official guessing game for corporate compliance meetings.
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory, send_file, abort, Response, g
 from werkzeug.utils import secure_filename
 from typing import Dict, Any
+from dataclasses import asdict
 import os
 
 from app.services.game_service import GameService
-from app.services.official_service import OfficialService
+from app.services.official_service import OfficialService, MAX_UPLOAD_BYTES
+from app.services.analytics_service import AnalyticsService
+from app.services.pack_service import PackService, MAX_PACK_BYTES
+from app.services.profiling_service import ProfilingService, PROFILE_HEADER
+from app.services.cache_service import FragmentCache
 
 app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-key-change-in-production')
+# Reject oversized request bodies while they stream in (photo + form fields)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 1024 * 1024
+# Endpoints that accept larger bodies than a photo upload
+UPLOAD_LIMITS = {'import_pack': MAX_PACK_BYTES + 1024 * 1024}
 
 # Initialize services
 game_service = GameService()
+# Pick up edits to officials.json made outside the app (0 disables)
+watch_interval = float(os.environ.get('CATALOG_WATCH_INTERVAL', 2))
+if watch_interval > 0:
+    game_service.start_watcher(watch_interval)
 official_service = OfficialService()
+analytics_service = AnalyticsService()
+pack_service = PackService(official_service)
+profiling_service = ProfilingService()
+page_cache = FragmentCache(max_entries=int(os.environ.get('PAGE_CACHE_ENTRIES', 128)))
+
+
+@app.before_request
+def apply_upload_limit():
+    """Raise the body size limit for endpoints that take bulk uploads"""
+    limit = UPLOAD_LIMITS.get(request.endpoint)
+    if limit:
+        request.max_content_length = limit
+
+
+@app.before_request
+def start_profiling():
+    """Profile this request if asked via X-Profile header or the admin toggle"""
+    g.profile = profiling_service.start(request.method, request.path, request.headers.get(PROFILE_HEADER))
+
+
+@app.after_request
+def finish_profiling(response):
+    active = g.pop('profile', None)
+    if active:
+        record = profiling_service.finish(active, response.status_code)
+        response.headers['X-Profile-Id'] = str(record.id)
+    return response
+
+
+@app.teardown_request
+def abandon_profiling(exc):
+    # Requests that raised never reach after_request
+    active = g.pop('profile', None)
+    if active:
+        profiling_service.finish(active, 500)
 
 
 @app.route('/')
 def index():
     """Main dashboard - game setup"""
-    stats = game_service.get_game_stats()
-    return render_template('index.html', stats=stats)
+    key = ('index', request.script_root, game_service.catalog_version, game_service.session_version)
+    return page_cache.get_or_render(
+        key, lambda: render_template('index.html', stats=game_service.get_game_stats())
+    )
 
 
 @app.route('/game')
@@ -34,24 +84,29 @@ def game():
     if not game_service.game_active:
         return redirect(url_for('index'))
     
-    leaderboard = game_service.get_leaderboard()
-    current_question = game_service.current_question
+    def render():
+        return render_template('game.html', 
+                             leaderboard=game_service.get_leaderboard(),
+                             current_question=game_service.current_question,
+                             game_stats=game_service.get_game_stats())
     
-    return render_template('game.html', 
-                         leaderboard=leaderboard,
-                         current_question=current_question,
-                         game_stats=game_service.get_game_stats())
+    # The template reads mode/fakes from the query string, so it is part of the key
+    key = ('game', request.script_root, request.full_path,
+           game_service.catalog_version, game_service.session_version)
+    return page_cache.get_or_render(key, render)
 
 
 @app.route('/admin')
 def admin():
     """Admin interface for managing officials"""
-    categories = official_service.get_categories()
-    states = official_service.get_states()
-    return render_template('admin.html', 
-                         categories=categories, 
-                         states=states,
-                         officials=game_service.officials)
+    def render():
+        return render_template('admin.html', 
+                             categories=official_service.get_categories(), 
+                             states=official_service.get_states(),
+                             officials=game_service.officials)
+    
+    key = ('admin', request.script_root, game_service.catalog_version)
+    return page_cache.get_or_render(key, render)
 
 
 @app.route('/photos/<filename>')
@@ -60,17 +115,33 @@ def serve_photo(filename):
     return send_from_directory('data/photos', filename)
 
 
+@app.route('/packs/<pack_id>/<path:member>')
+def serve_pack_photo(pack_id, member):
+    """Serve a photo straight out of a mounted game pack"""
+    photo = pack_service.read_photo(pack_id, member)
+    if photo is None:
+        abort(404)
+    data, mimetype = photo
+    response = Response(data, mimetype=mimetype)
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
 # Game API endpoints
 @app.route('/api/game/setup', methods=['POST'])
 def setup_game():
     """Setup new game session"""
     data = request.get_json()
     player_names = data.get('players', [])
+    buzzer_mode = bool(data.get('buzzer', False))
     
     if not player_names:
         return jsonify({"success": False, "message": "At least one player required"})
     
-    success = game_service.setup_game(player_names)
+    try:
+        success = game_service.setup_game(player_names, buzzer_mode=buzzer_mode)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)})
     return jsonify({"success": success})
 
 
@@ -96,7 +167,8 @@ def new_question():
             "fun_fact": question.official.fun_fact
         } if question.question_type == "find_photo" else {"photo_path": question.official.photo_path},
         "options": [{"id": o.id, "name": o.name, "photo_path": o.photo_path} for o in question.options] if question.options else None,
-        "points": question.points
+        "points": question.points,
+        "question_id": question.question_id
     }
     
     return jsonify({"success": True, "question": question_data})
@@ -108,8 +180,11 @@ def submit_answer():
     data = request.get_json()
     answer = data.get('answer', '')
     player_name = data.get('player', '')
+    question_id = data.get('question_id')
+    if not isinstance(question_id, int) or isinstance(question_id, bool):
+        return jsonify({"success": False, "message": "question_id required"})
     
-    result = game_service.answer_question(answer, player_name)
+    result = game_service.answer_question(answer, player_name, question_id)
     return jsonify(result)
 
 
@@ -119,13 +194,67 @@ def get_leaderboard():
     return jsonify(game_service.get_leaderboard())
 
 
+@app.route('/api/stats')
+def get_stats():
+    """Get catalog and game statistics"""
+    return jsonify({
+        "game": game_service.get_game_stats(),
+        "catalog": game_service.get_catalog_stats(),
+        "versions": game_service.get_versions(),
+        "page_cache": page_cache.stats()
+    })
+
+
 @app.route('/api/game/end', methods=['POST'])
 def end_game():
     """End current game session"""
-    summary = game_service.end_game()
+    def record(summary):
+        try:
+            analytics_service.record_game(summary)
+        except Exception as e:
+            print(f"Error recording game analytics: {e}")
+    
+    summary = game_service.end_game(on_finished=record)
     return jsonify(summary)
 
 
+# Analytics API endpoints
+@app.route('/api/analytics/leaderboard')
+def season_leaderboard():
+    """Season leaderboard across games, optionally bounded by ISO weeks (e.g. 2025-W02)"""
+    leaderboard = analytics_service.get_season_leaderboard(
+        start_week=request.args.get('from'),
+        end_week=request.args.get('to'),
+        limit=request.args.get('limit', 10, type=int)
+    )
+    return jsonify(leaderboard)
+
+
+@app.route('/api/analytics/player/<name>')
+def player_history(name):
+    """All-time and weekly history for one player"""
+    history = analytics_service.get_player_history(name)
+    if not history:
+        return jsonify({"success": False, "message": "Player not found"})
+    return jsonify(history)
+
+
+@app.route('/api/analytics/hardest-officials')
+def hardest_officials():
+    """Officials players most often get wrong"""
+    officials = analytics_service.get_hardest_officials(
+        limit=request.args.get('limit', 10, type=int),
+        min_asked=request.args.get('min_asked', 3, type=int)
+    )
+    return jsonify(officials)
+
+
+@app.route('/api/analytics/weeks')
+def weekly_summary():
+    """Games and questions played per week"""
+    return jsonify(analytics_service.get_weekly_summary(request.args.get('limit', 52, type=int)))
+
+
 # Admin API endpoints
 @app.route('/api/admin/official', methods=['POST'])
 def add_official():
@@ -171,15 +300,174 @@ def add_official():
         return jsonify({"success": False, "message": f"Error adding official: {str(e)}"})
 
 
+@app.route('/api/admin/official/<official_id>', methods=['PUT'])
+def update_official(official_id):
+    """Edit an existing official"""
+    data = request.get_json(silent=True) or {}
+    
+    current = game_service.catalog.by_id.get(official_id)
+    if not current:
+        return jsonify({"success": False, "message": "Official not found"})
+    
+    # Partial edit: validate the submitted fields on top of the current record
+    fields = {key: data[key] for key in ('name', 'position', 'state', 'fun_fact', 'category', 'is_fake') if key in data}
+    validation = official_service.validate_official_data({**asdict(current), **fields})
+    if not validation['valid']:
+        return jsonify({"success": False, "errors": validation['errors']})
+    
+    try:
+        success = game_service.update_official(official_id, **fields)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)})
+    if not success:
+        return jsonify({"success": False, "message": "Official not found"})
+    return jsonify({"success": True, "official_id": official_id})
+
+
+@app.route('/api/admin/search')
+def search_officials():
+    """Typeahead search over officials"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    
+    results = game_service.search_officials(query, min(max(limit, 1), 100))
+    return jsonify({"success": True, "query": query, "results": results})
+
+
 @app.route('/api/admin/sample-data', methods=['POST'])
 def create_sample_data():
     """Create sample officials data"""
     success = official_service.create_sample_data()
     if success:
-        game_service.load_officials()  # Reload officials
+        # Reload now rather than waiting for the watcher; readers keep the old snapshot until the swap
+        game_service.load_officials()
     return jsonify({"success": success})
 
 
+# Game pack endpoints
+@app.route('/api/admin/packs')
+def list_packs():
+    """List available game packs"""
+    return jsonify(pack_service.list_packs())
+
+
+@app.route('/api/admin/packs/export', methods=['POST'])
+def export_pack():
+    """Export officials (all, or the given ids) as a downloadable game pack"""
+    data = request.get_json() or {}
+    pack_id = secure_filename(data.get('name', ''))
+    if not pack_id:
+        return jsonify({"success": False, "message": "Pack name required"})
+    
+    ids = set(data.get('ids', []))
+    officials = [o for o in game_service.get_local_officials() if not ids or o.id in ids]
+    if not officials:
+        return jsonify({"success": False, "message": "No officials to export"})
+    
+    path = pack_service.export_pack(pack_id, officials, title=data.get('title', ''))
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=os.path.basename(path))
+
+
+@app.route('/api/admin/packs/import', methods=['POST'])
+def import_pack():
+    """Upload a game pack and import its officials into the catalog"""
+    try:
+        pack_file = request.files.get('pack')
+        if not pack_file:
+            return jsonify({"success": False, "message": "Pack file required"})
+        
+        pack_id = secure_filename(os.path.splitext(pack_file.filename or '')[0]) or 'imported'
+        pack_service.save_upload(pack_file, pack_id)
+        
+        officials = pack_service.import_pack(pack_id)
+        added = game_service.import_officials(officials)
+        return jsonify({"success": True, "pack": pack_id, "imported": added})
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error importing pack: {str(e)}"})
+
+
+@app.route('/api/admin/packs/<pack_id>/mount', methods=['POST'])
+def mount_pack(pack_id):
+    """Mount a stored game pack read-only, without extracting it"""
+    try:
+        officials = pack_service.mount_pack(pack_id)
+    except FileNotFoundError:
+        return jsonify({"success": False, "message": "Pack not found"})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error mounting pack: {str(e)}"})
+    
+    mounted = game_service.mount_officials(secure_filename(pack_id), officials)
+    return jsonify({"success": True, "pack": pack_id, "mounted": mounted})
+
+
+@app.route('/api/admin/packs/<pack_id>/unmount', methods=['POST'])
+def unmount_pack(pack_id):
+    """Unmount a game pack"""
+    pack_id = secure_filename(pack_id)
+    removed = game_service.unmount_officials(pack_id)
+    success = pack_service.unmount_pack(pack_id)
+    return jsonify({"success": success, "removed": removed})
+
+
+# Profiling endpoints
+@app.route('/api/admin/profiling', methods=['GET', 'POST'])
+def profiling_config():
+    """Get or change route profiling settings"""
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        try:
+            config = profiling_service.configure(
+                enabled=data.get('enabled'),
+                routes=data.get('routes'),
+                mode=data.get('mode')
+            )
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)})
+        return jsonify({"success": True, **config})
+    return jsonify(profiling_service.get_config())
+
+
+@app.route('/api/admin/profiles')
+def list_profiles():
+    """List captured request profiles, newest first"""
+    return jsonify(profiling_service.list_profiles())
+
+
+@app.route('/api/admin/profiles/<int:profile_id>')
+def get_profile(profile_id):
+    """Profile summary with the top functions by cumulative time"""
+    record = profiling_service.get_profile(profile_id)
+    if not record:
+        return jsonify({"success": False, "message": "Profile not found"})
+    return jsonify({**record.summary(), "report": profiling_service.top_functions(record)})
+
+
+@app.route('/api/admin/profiles/<int:profile_id>/download')
+def download_profile(profile_id):
+    """Download a profile as pstats (?format=pstats) or collapsed stacks (?format=collapsed)"""
+    record = profiling_service.get_profile(profile_id)
+    if not record:
+        abort(404)
+    
+    fmt = request.args.get('format', 'pstats')
+    if fmt == 'collapsed':
+        return Response(
+            profiling_service.to_collapsed(record),
+            mimetype='text/plain',
+            headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.collapsed"}
+        )
+    
+    data = profiling_service.to_pstats(record)
+    if data is None:
+        abort(404)
+    return Response(
+        data,
+        mimetype='application/octet-stream',
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.pstats"}
+    )
+
+
 @app.route('/health')
 def health():
     """Health check endpoint for Docker"""
@@ -199,7 +487,13 @@ def api_status():
             "/api/game/question", 
             "/api/game/answer",
             "/api/game/leaderboard",
+            "/api/stats",
+            "/api/analytics/leaderboard",
+            "/api/analytics/hardest-officials",
+            "/api/admin/packs",
+            "/api/admin/profiles",
             "/api/admin/official",
+            "/api/admin/search",
             "/health"
         ]
     })
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Analytics Service for Guess That Official
+Persists finished games to SQLite with pre-aggregated rollups
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    played_at TEXT NOT NULL,
+    week TEXT NOT NULL,
+    total_questions INTEGER NOT NULL,
+    winner TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_games_week ON games (week);
+
+CREATE TABLE IF NOT EXISTS player_results (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (game_id, player)
+);
+
+CREATE TABLE IF NOT EXISTS official_results (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    official_id TEXT NOT NULL,
+    asked INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (game_id, official_id)
+);
+
+CREATE TABLE IF NOT EXISTS week_rollup (
+    week TEXT PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    questions INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS player_week_rollup (
+    week TEXT NOT NULL,
+    player TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    score INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, player)
+);
+
+CREATE TABLE IF NOT EXISTS player_rollup (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    score INTEGER NOT NULL DEFAULT 0,
+    best_score INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_player_rollup_score ON player_rollup (score DESC);
+
+CREATE TABLE IF NOT EXISTS official_rollup (
+    official_id TEXT PRIMARY KEY,
+    official_name TEXT NOT NULL,
+    asked INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def week_key(moment: datetime) -> str:
+    """ISO year-week bucket, e.g. 2025-W02"""
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class AnalyticsService:
+    """Cross-game history for season leaderboards and official difficulty reports"""
+
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        self.db_file = os.path.join(data_dir, "analytics", "analytics.db")
+        self.ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call keeps this safe across Flask threads"""
+        connection = sqlite3.connect(self.db_file, timeout=10)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def ensure_schema(self) -> None:
+        """Create the database and tables if needed"""
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def record_game(self, summary: Dict[str, Any], played_at: Optional[datetime] = None) -> int:
+        """Persist a finished game summary and fold it into the rollups"""
+        played_at = played_at or datetime.now()
+        week = week_key(played_at)
+        final_scores = summary.get("final_scores", [])
+        official_results = summary.get("official_results", [])
+        winner = summary.get("winner")
+        # Only a game that was actually played, and won with points, counts as a win
+        won_game = winner and summary.get("total_questions", 0) > 0 and winner.get("score", 0) > 0
+        winner_name = winner["name"] if won_game else None
+
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO games (played_at, week, total_questions, winner) VALUES (?, ?, ?, ?)",
+                (played_at.isoformat(), week, summary.get("total_questions", 0), winner_name)
+            )
+            game_id = cursor.lastrowid
+
+            connection.execute(
+                """INSERT INTO week_rollup (week, games, questions) VALUES (?, 1, ?)
+                   ON CONFLICT (week) DO UPDATE SET
+                       games = games + 1, questions = questions + excluded.questions""",
+                (week, summary.get("total_questions", 0))
+            )
+
+            for player in self._players_by_name(final_scores):
+                won = 1 if player["name"] == winner_name else 0
+                row = (player["name"], player["score"], player["correct"], player["total"])
+                connection.execute(
+                    "INSERT INTO player_results (game_id, player, score, correct, total) VALUES (?, ?, ?, ?, ?)",
+                    (game_id, *row)
+                )
+                connection.execute(
+                    """INSERT INTO player_week_rollup (week, player, games, wins, score, correct, total)
+                       VALUES (?, ?, 1, ?, ?, ?, ?)
+                       ON CONFLICT (week, player) DO UPDATE SET
+                           games = games + 1, wins = wins + excluded.wins,
+                           score = score + excluded.score, correct = correct + excluded.correct,
+                           total = total + excluded.total""",
+                    (week, player["name"], won, *row[1:])
+                )
+                connection.execute(
+                    """INSERT INTO player_rollup (player, games, wins, score, best_score, correct, total)
+                       VALUES (?, 1, ?, ?, ?, ?, ?)
+                       ON CONFLICT (player) DO UPDATE SET
+                           games = games + 1, wins = wins + excluded.wins,
+                           score = score + excluded.score,
+                           best_score = MAX(best_score, excluded.best_score),
+                           correct = correct + excluded.correct, total = total + excluded.total""",
+                    (player["name"], won, player["score"], player["score"], player["correct"], player["total"])
+                )
+
+            for result in official_results:
+                connection.execute(
+                    "INSERT INTO official_results (game_id, official_id, asked, correct) VALUES (?, ?, ?, ?)",
+                    (game_id, result["official_id"], result["asked"], result["correct"])
+                )
+                connection.execute(
+                    """INSERT INTO official_rollup (official_id, official_name, asked, correct)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT (official_id) DO UPDATE SET
+                           official_name = excluded.official_name,
+                           asked = asked + excluded.asked, correct = correct + excluded.correct""",
+                    (result["official_id"], result["name"], result["asked"], result["correct"])
+                )
+
+        return game_id
+
+    @staticmethod
+    def _players_by_name(final_scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One row per player name (results are keyed by name), summing any repeats"""
+        players: Dict[str, Dict[str, Any]] = {}
+        for player in final_scores:
+            merged = players.get(player["name"])
+            if merged is None:
+                players[player["name"]] = {key: player[key] for key in ("name", "score", "correct", "total")}
+            else:
+                for key in ("score", "correct", "total"):
+                    merged[key] += player[key]
+        return list(players.values())
+
+    def get_season_leaderboard(self, start_week: Optional[str] = None, end_week: Optional[str] = None,
+                               limit: int = 10) -> List[Dict[str, Any]]:
+        """Players ranked by total score, all-time or over an inclusive week range"""
+        if not start_week and not end_week:
+            query = "SELECT player, games, wins, score, correct, total FROM player_rollup ORDER BY score DESC LIMIT ?"
+            params: tuple = (limit,)
+        else:
+            query = """SELECT player, SUM(games) AS games, SUM(wins) AS wins, SUM(score) AS score,
+                              SUM(correct) AS correct, SUM(total) AS total
+                       FROM player_week_rollup
+                       WHERE week >= ? AND week <= ?
+                       GROUP BY player ORDER BY score DESC LIMIT ?"""
+            params = (start_week or "", end_week or "9999-W99", limit)
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query, params).fetchall()
+
+        return [
+            {
+                "name": row["player"],
+                "games": row["games"],
+                "wins": row["wins"],
+                "score": row["score"],
+                "accuracy": round(row["correct"] / max(row["total"], 1) * 100, 1)
+            }
+            for row in rows
+        ]
+
+    def get_player_history(self, player: str) -> Dict[str, Any]:
+        """All-time totals and per-week breakdown for one player"""
+        with closing(self._connect()) as connection:
+            totals = connection.execute("SELECT * FROM player_rollup WHERE player = ?", (player,)).fetchone()
+            weeks = connection.execute(
+                "SELECT week, games, wins, score, correct, total FROM player_week_rollup WHERE player = ? ORDER BY week",
+                (player,)
+            ).fetchall()
+
+        if not totals:
+            return {}
+
+        return {
+            "name": player,
+            "games": totals["games"],
+            "wins": totals["wins"],
+            "score": totals["score"],
+            "best_score": totals["best_score"],
+            "accuracy": round(totals["correct"] / max(totals["total"], 1) * 100, 1),
+            "weeks": [dict(row) for row in weeks]
+        }
+
+    def get_hardest_officials(self, limit: int = 10, min_asked: int = 3) -> List[Dict[str, Any]]:
+        """Officials with the lowest correct-answer rate"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                """SELECT official_id, official_name, asked, correct
+                   FROM official_rollup WHERE asked >= ?
+                   ORDER BY CAST(correct AS REAL) / asked ASC, asked DESC LIMIT ?""",
+                (min_asked, limit)
+            ).fetchall()
+
+        return [
+            {
+                "official_id": row["official_id"],
+                "name": row["official_name"],
+                "asked": row["asked"],
+                "correct": row["correct"],
+                "accuracy": round(row["correct"] / max(row["asked"], 1) * 100, 1)
+            }
+            for row in rows
+        ]
+
+    def get_weekly_summary(self, limit: int = 52) -> List[Dict[str, Any]]:
+        """Games and questions per week, most recent first"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT week, games, questions FROM week_rollup ORDER BY week DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Cache Service for Guess That Official
+LRU cache for rendered page fragments, keyed by catalog/session version
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Hashable
+
+
+class FragmentCache:
+    """Memoizes rendered fragments; stale entries simply stop being looked up
+    once a version in their key moves on, and age out through LRU eviction"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        """Return the cached fragment for key, rendering and storing it on a miss"""
+        with self.lock:
+            fragment = self.entries.get(key)
+            if fragment is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        # Render outside the lock; concurrent misses on one key just render twice
+        fragment = render()
+
+        with self.lock:
+            self.entries[key] = fragment
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
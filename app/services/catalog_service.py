@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Catalog Service for Guess That Official
+Immutable catalog snapshots and a watcher that hot-reloads officials.json
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from app.services.search_service import SearchIndex
+from app.services.stats_service import CatalogStats
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One published version of the officials catalog
+
+    Snapshots are never modified after publication. Writers build the next
+    snapshot from a copy and swap the reference, so a reader that grabbed a
+    snapshot sees one consistent catalog for as long as it holds it.
+    """
+    officials: Tuple[Any, ...] = ()
+    by_id: Dict[str, Any] = field(default_factory=dict)
+    search_index: SearchIndex = field(default_factory=SearchIndex)
+    stats: CatalogStats = field(default_factory=CatalogStats)
+    # Officials from read-only mounted game packs, by pack id - never saved to officials.json
+    mounted: Dict[str, Tuple[Any, ...]] = field(default_factory=dict)
+    version: int = 0
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class CatalogWatcher:
+    """Polls the officials file and triggers a reload when it changes
+
+    Polling keeps this dependency-free; the reload itself runs on the
+    watcher thread, so requests never wait for it.
+    """
+
+    def __init__(self, path: str, known_signature: Callable[[], Optional[Tuple[int, int]]],
+                 reload: Callable[[], None], interval: float = 2.0):
+        self.path = path
+        self.known_signature = known_signature
+        self.reload = reload
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def check(self) -> bool:
+        """Reload if the file differs from what the catalog was last synced with"""
+        signature = file_signature(self.path)
+        if signature is None or signature == self.known_signature():
+            return False
+        self.reload()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error watching officials file: {e}")
@@ -7,10 +7,18 @@ Handles game logic, scoring, and session management
 import json
 import random
 import os
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import time
+import threading
+from collections import deque
+from itertools import count
+from typing import Dict, List, Any, Optional, Callable, Deque, Set, Tuple
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime
 
+from app.services.search_service import SearchIndex
+from app.services.stats_service import CatalogStats
+from app.services.catalog_service import CatalogSnapshot, CatalogWatcher, file_signature
+
 
 @dataclass
 class Official:
@@ -43,6 +51,8 @@ class GameQuestion:
     options: List[Official] = None  # For multiple choice
     correct_answer: str = ""
     points: int = 10
+    buzzes: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Buzzer mode submissions by player, in arrival order
+    question_id: int = 0  # Assigned when the question opens; answers must name it
 
 
 class GameService:
@@ -51,78 +61,351 @@ class GameService:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.officials_file = os.path.join(data_dir, "officials", "officials.json")
-        self.officials: List[Official] = []
         self.players: List[Player] = []
+        self.players_by_name: Dict[str, Player] = {}
         self.current_question: Optional[GameQuestion] = None
         self.question_history: List[GameQuestion] = []
+        self.official_results: Dict[str, Dict[str, Any]] = {}  # Per-official tally for this game
         self.game_active = False
+        self.buzzer_mode = False
+        # Session state (players, current question, history) is guarded by game_lock.
+        # The catalog is copy-on-write: catalog_lock only serializes writers, readers
+        # grab the current snapshot reference and never block.
+        self.game_lock = threading.RLock()
+        self.catalog_lock = threading.RLock()
+        # Answers are stamped on arrival and take turns in stamp order (see answer_question)
+        self.buzz_sequence = count(1)
+        self.question_sequence = count(1)
+        self.arrival_lock = threading.Lock()
+        self.arrivals: Deque[Optional[threading.Event]] = deque()
+        self.catalog = CatalogSnapshot()
+        self.catalog_file_signature = None  # officials.json (mtime, size) the catalog is in sync with
+        self.watcher: Optional[CatalogWatcher] = None
+        # Bumped on every session change; rendered pages are cached under this and catalog_version
+        self.session_version = 0
         self.load_officials()
     
+    # Read-only views of the current catalog snapshot
+    @property
+    def officials(self) -> Tuple[Official, ...]:
+        return self.catalog.officials
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        return self.catalog.search_index
+    
+    @property
+    def catalog_stats(self) -> CatalogStats:
+        return self.catalog.stats
+    
+    @property
+    def catalog_version(self) -> int:
+        return self.catalog.version
+    
+    @property
+    def mounted_officials(self) -> Dict[str, Tuple[Official, ...]]:
+        return self.catalog.mounted
+    
+    def _publish(self, base: CatalogSnapshot, **changes) -> CatalogSnapshot:
+        """Swap in the next catalog snapshot (caller holds catalog_lock)"""
+        if 'officials' in changes and 'by_id' not in changes:
+            changes['by_id'] = {official.id: official for official in changes['officials']}
+        self.catalog = replace(base, version=base.version + 1, **changes)
+        return self.catalog
+    
+    @staticmethod
+    def _unique_id(base_id: str, taken, start: int = 1) -> str:
+        """First "<base_id>_<n>" (n >= start) not in taken"""
+        n = start
+        while f"{base_id}_{n}" in taken:
+            n += 1
+        return f"{base_id}_{n}"
+    
+    def _merge_pack_officials(self, catalog: CatalogSnapshot, officials: List[Official]) -> Dict[str, Official]:
+        """Pack officials not already in the catalog, keyed by the id they will get
+        
+        A record already present (photo location aside) is skipped; a different
+        official that happens to reuse an id gets a fresh one instead.
+        """
+        merged: Dict[str, Official] = {}
+        for official in officials:
+            existing = catalog.by_id.get(official.id) or merged.get(official.id)
+            if existing is not None:
+                if replace(official, photo_path=existing.photo_path) == existing:
+                    continue
+                taken = catalog.by_id.keys() | merged.keys()
+                official = replace(official, id=self._unique_id(official.id, taken, start=2))
+            merged[official.id] = official
+        return merged
+    
     def load_officials(self) -> None:
-        """Load officials from JSON file"""
-        try:
-            if os.path.exists(self.officials_file):
+        """Load officials from JSON file
+        
+        The new catalog and its indexes are built without holding any lock and
+        published with a single reference swap, so games in progress keep
+        reading the old snapshot until they next look.
+        """
+        for _ in range(3):
+            base = self.catalog
+            signature = file_signature(self.officials_file)
+            if signature is None:
+                # Create empty officials file
+                with self.catalog_lock:
+                    self.save_officials()
+                return
+            
+            try:
                 with open(self.officials_file, 'r') as f:
                     data = json.load(f)
-                    self.officials = [Official(**official) for official in data.get('officials', [])]
-            else:
-                # Create empty officials file
-                os.makedirs(os.path.dirname(self.officials_file), exist_ok=True)
-                self.save_officials()
-        except Exception as e:
-            print(f"Error loading officials: {e}")
-            self.officials = []
+                local = [Official(**official) for official in data.get('officials', [])]
+            except Exception as e:
+                # Keep serving the current catalog (e.g. file caught mid-edit)
+                print(f"Error loading officials: {e}")
+                return
+            
+            search_index = SearchIndex()
+            search_index.rebuild(local)
+            
+            with self.catalog_lock:
+                # Writers publish before they save, so an unchanged snapshot is not
+                # enough: the file we read must also still be the one on disk
+                if self.catalog is not base or file_signature(self.officials_file) != signature:
+                    continue
+                
+                officials = list(local)
+                for mounted in base.mounted.values():
+                    officials.extend(mounted)
+                    for official in mounted:
+                        search_index.add(official)
+                stats = CatalogStats()
+                stats.rebuild(officials)
+                
+                self._publish(base, officials=tuple(officials), search_index=search_index, stats=stats)
+                self.catalog_file_signature = signature
+                return
+    
+    def start_watcher(self, interval: float = 2.0) -> None:
+        """Hot-reload the catalog when officials.json changes on disk"""
+        if not self.watcher:
+            self.watcher = CatalogWatcher(
+                self.officials_file,
+                known_signature=lambda: self.catalog_file_signature,
+                reload=self.load_officials,
+                interval=interval
+            )
+        self.watcher.start()
+    
+    def stop_watcher(self) -> None:
+        if self.watcher:
+            self.watcher.stop()
     
     def save_officials(self) -> None:
-        """Save officials to JSON file"""
+        """Save officials to JSON file (caller holds catalog_lock)"""
         try:
             os.makedirs(os.path.dirname(self.officials_file), exist_ok=True)
             data = {
-                "officials": [asdict(official) for official in self.officials],
+                "officials": [asdict(official) for official in self.get_local_officials()],
                 "last_updated": datetime.now().isoformat()
             }
-            with open(self.officials_file, 'w') as f:
+            # Write-then-rename so the watcher (or anyone else) never reads half a file
+            temp_file = self.officials_file + ".tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(data, f, indent=2)
+            os.replace(temp_file, self.officials_file)
+            # Our own write is not an external change
+            self.catalog_file_signature = file_signature(self.officials_file)
         except Exception as e:
             print(f"Error saving officials: {e}")
     
+    @staticmethod
+    def _mounted_ids(catalog: CatalogSnapshot) -> Set[str]:
+        return {o.id for officials in catalog.mounted.values() for o in officials}
+    
+    def get_local_officials(self) -> List[Official]:
+        """Officials owned by this instance, i.e. excluding mounted game packs"""
+        catalog = self.catalog
+        if not catalog.mounted:
+            return list(catalog.officials)
+        mounted_ids = self._mounted_ids(catalog)
+        return [o for o in catalog.officials if o.id not in mounted_ids]
+    
     def add_official(self, name: str, position: str, state: str, photo_path: str, 
                     fun_fact: str = None, category: str = "general", is_fake: bool = False) -> str:
         """Add a new official to the game"""
-        official_id = f"{state.lower()}_{position.lower().replace(' ', '_')}_{len(self.officials)}"
-        official = Official(
-            id=official_id,
-            name=name,
-            position=position,
-            state=state,
-            photo_path=photo_path,
-            fun_fact=fun_fact,
-            category=category,
-            is_fake=is_fake
-        )
-        self.officials.append(official)
-        self.save_officials()
-        return official_id
+        with self.catalog_lock:
+            catalog = self.catalog
+            official_id = self._unique_id(
+                f"{state.lower()}_{position.lower().replace(' ', '_')}",
+                catalog.by_id,
+                start=len(catalog.officials)
+            )
+            official = Official(
+                id=official_id,
+                name=name,
+                position=position,
+                state=state,
+                photo_path=photo_path,
+                fun_fact=fun_fact,
+                category=category,
+                is_fake=is_fake
+            )
+            search_index = catalog.search_index.copy()
+            search_index.add(official)
+            stats = catalog.stats.copy()
+            stats.add(official)
+            
+            self._publish(
+                catalog,
+                officials=catalog.officials + (official,),
+                by_id={**catalog.by_id, official_id: official},
+                search_index=search_index,
+                stats=stats
+            )
+            self.save_officials()
+            return official_id
+    
+    def update_official(self, official_id: str, **fields) -> bool:
+        """Edit an existing official's fields
+        
+        Officials from mounted game packs are read-only: the edit could not be
+        saved, and unmounting must uncount exactly the records it mounted.
+        """
+        with self.catalog_lock:
+            catalog = self.catalog
+            official = catalog.by_id.get(official_id)
+            if not official:
+                return False
+            if official_id in self._mounted_ids(catalog):
+                raise ValueError("Official is read-only (mounted game pack)")
+            
+            # Edit a copy - the published snapshot keeps the old record
+            known = set(Official.__dataclass_fields__) - {'id'}
+            edited = replace(official, **{name: value for name, value in fields.items() if name in known})
+            
+            search_index = catalog.search_index.copy()
+            search_index.update(edited)
+            stats = catalog.stats.copy()
+            stats.remove(official)
+            stats.add(edited)
+            
+            self._publish(
+                catalog,
+                officials=tuple(edited if o is official else o for o in catalog.officials),
+                by_id={**catalog.by_id, official_id: edited},
+                search_index=search_index,
+                stats=stats
+            )
+            self.save_officials()
+            return True
+    
+    def import_officials(self, officials: List[Official]) -> int:
+        """Bulk-add officials (e.g. from a game pack), skipping ones already present"""
+        with self.catalog_lock:
+            catalog = self.catalog
+            added = self._merge_pack_officials(catalog, officials)
+            if not added:
+                return 0
+            
+            search_index = catalog.search_index.copy()
+            stats = catalog.stats.copy()
+            for official in added.values():
+                search_index.add(official)
+                stats.add(official)
+            
+            self._publish(
+                catalog,
+                officials=catalog.officials + tuple(added.values()),
+                by_id={**catalog.by_id, **added},
+                search_index=search_index,
+                stats=stats
+            )
+            self.save_officials()
+            return len(added)
+    
+    def mount_officials(self, pack_id: str, officials: List[Official]) -> int:
+        """Add a mounted pack's officials to the catalog without persisting them"""
+        with self.catalog_lock:
+            self.unmount_officials(pack_id)
+            catalog = self.catalog
+            mounted = self._merge_pack_officials(catalog, officials)
+            
+            search_index = catalog.search_index.copy()
+            stats = catalog.stats.copy()
+            for official in mounted.values():
+                search_index.add(official)
+                stats.add(official)
+            
+            self._publish(
+                catalog,
+                officials=catalog.officials + tuple(mounted.values()),
+                by_id={**catalog.by_id, **mounted},
+                search_index=search_index,
+                stats=stats,
+                mounted={**catalog.mounted, pack_id: tuple(mounted.values())}
+            )
+            return len(mounted)
+    
+    def unmount_officials(self, pack_id: str) -> int:
+        """Drop a mounted pack's officials from the catalog"""
+        with self.catalog_lock:
+            catalog = self.catalog
+            mounted = catalog.mounted.get(pack_id)
+            if mounted is None:
+                return 0
+            
+            mounted_ids = {o.id for o in mounted}
+            search_index = catalog.search_index.copy()
+            stats = catalog.stats.copy()
+            for official in mounted:
+                search_index.remove(official.id)
+                stats.remove(official)
+            
+            self._publish(
+                catalog,
+                officials=tuple(o for o in catalog.officials if o.id not in mounted_ids),
+                search_index=search_index,
+                stats=stats,
+                mounted={key: value for key, value in catalog.mounted.items() if key != pack_id}
+            )
+            return len(mounted)
     
-    def setup_game(self, player_names: List[str]) -> bool:
-        """Initialize a new game session"""
+    def search_officials(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search officials by name, position, state, category or fun fact"""
+        results = self.catalog.search_index.search(query, limit)
+        return [{**asdict(official), "score": score} for official, score in results]
+    
+    def setup_game(self, player_names: List[str], buzzer_mode: bool = False) -> bool:
+        """Initialize a new game session
+        
+        In buzzer mode every player may answer the open question once; the
+        first correct submission to arrive wins it and closes the question.
+        """
+        if len(set(player_names)) != len(player_names):
+            # Players are looked up by name - two "Bob"s would share one entry
+            raise ValueError("Player names must be unique")
         if not self.officials:
             return False
         
-        self.players = [Player(name=name) for name in player_names]
-        self.question_history = []
-        self.current_question = None
-        self.game_active = True
+        with self.game_lock:
+            self.players = [Player(name=name) for name in player_names]
+            self.players_by_name = {player.name: player for player in self.players}
+            self.question_history = []
+            self.official_results = {}
+            self.current_question = None
+            self.buzzer_mode = buzzer_mode
+            self.game_active = True
+            self.session_version += 1
         return True
     
     def generate_question(self, question_type: str = "identify_official", 
                          include_fakes: bool = False) -> Optional[GameQuestion]:
         """Generate a new question"""
-        if not self.officials:
+        # One snapshot for the whole selection - reloads can't change it underneath us
+        available_officials = list(self.catalog.officials)
+        if not available_officials:
             return None
         
         # Filter officials based on preferences
-        available_officials = self.officials.copy()
         if not include_fakes:
             available_officials = [o for o in available_officials if not o.is_fake]
         
@@ -170,61 +453,152 @@ class GameService:
                 points=10
             )
         
-        self.current_question = question
+        with self.game_lock:
+            question.question_id = next(self.question_sequence)
+            self.current_question = question
+            self.session_version += 1
         return question
     
-    def answer_question(self, answer: str, player_name: str) -> Dict[str, Any]:
-        """Process an answer and update scores"""
-        if not self.current_question or not self.game_active:
-            return {"success": False, "message": "No active question"}
-        
-        # Find player
-        player = next((p for p in self.players if p.name == player_name), None)
-        if not player:
-            return {"success": False, "message": "Player not found"}
-        
-        # Check answer
-        is_correct = False
-        if self.current_question.question_type == "identify_official":
+    def check_answer(self, question: GameQuestion, answer: str) -> bool:
+        """Check an answer against a question"""
+        if question.question_type == "identify_official":
             # Flexible matching for identify questions
             answer_lower = answer.lower().strip()
-            correct_lower = self.current_question.correct_answer.lower()
-            is_correct = (
-                self.current_question.official.name.lower() in answer_lower or
+            correct_lower = question.correct_answer.lower()
+            return bool(answer_lower) and (
+                question.official.name.lower() in answer_lower or
                 answer_lower in correct_lower
             )
-        else:
-            # Exact matching for multiple choice/find photo
-            is_correct = answer == self.current_question.correct_answer
+        # Exact matching for multiple choice/find photo
+        return answer == question.correct_answer
+    
+    def answer_question(self, answer: str, player_name: str, question_id: int) -> Dict[str, Any]:
+        """Process an answer to the question with question_id and update scores
+        
+        Submissions are stamped the moment they arrive, before any lock is
+        taken, and then scored strictly in stamp order - lock acquisition
+        order is not FIFO, so it must not decide who buzzed first. An answer
+        for a question that has since closed is rejected rather than scored
+        against whatever question is open now.
+        """
+        with self.arrival_lock:
+            received_at = time.time()
+            sequence = next(self.buzz_sequence)
+            # Nobody ahead of us: go straight in, no need to wait for a turn
+            turn = threading.Event() if self.arrivals else None
+            self.arrivals.append(turn)
         
-        # Update player stats
+        if turn:
+            turn.wait()
+        try:
+            return self._answer(answer, player_name, question_id, received_at, sequence)
+        finally:
+            with self.arrival_lock:
+                self.arrivals.popleft()
+                if self.arrivals:
+                    self.arrivals[0].set()
+    
+    def _answer(self, answer: str, player_name: str, question_id: int,
+                received_at: float, sequence: int) -> Dict[str, Any]:
+        """Score one submission; runs only when every earlier arrival is done"""
+        with self.game_lock:
+            question = self.current_question
+            if not question or not self.game_active:
+                return {"success": False, "message": "No active question"}
+            if question.question_id != question_id:
+                return {"success": False, "message": "Question is no longer open"}
+            
+            player = self.players_by_name.get(player_name)
+            if not player:
+                return {"success": False, "message": "Player not found"}
+            
+            if self.buzzer_mode:
+                return self._buzz(question, player, answer, received_at, sequence)
+            
+            is_correct = self.check_answer(question, answer)
+            points = self._score_answer(question, player, is_correct)
+            self._close_question(question, is_correct)
+            # Only after every mutation, so a page cached under the new version is complete
+            self.session_version += 1
+            
+            return {
+                "success": True,
+                "correct": is_correct,
+                "points_earned": points,
+                "player_score": player.score,
+                "streak": player.streak,
+                "correct_answer": question.correct_answer
+            }
+    
+    def _buzz(self, question: GameQuestion, player: Player, answer: str,
+              received_at: float, sequence: int) -> Dict[str, Any]:
+        """Buzzer mode: one attempt per player, first correct arrival wins"""
+        if player.name in question.buzzes:
+            return {"success": False, "message": "Already answered this question"}
+        
+        is_correct = self.check_answer(question, answer)
+        question.buzzes[player.name] = {
+            "player": player.name,
+            "answer": answer,
+            "correct": is_correct,
+            "received_at": received_at,
+            "sequence": sequence
+        }
+        points = self._score_answer(question, player, is_correct)
+        
+        # Close on the first correct answer, or once everyone has missed
+        closed = is_correct or len(question.buzzes) >= len(self.players_by_name)
+        if closed:
+            self._close_question(question, is_correct)
+        self.session_version += 1
+        
+        return {
+            "success": True,
+            "correct": is_correct,
+            "points_earned": points,
+            "player_score": player.score,
+            "streak": player.streak,
+            "question_closed": closed,
+            "winner": player.name if is_correct else None,
+            "received_at": received_at,
+            "sequence": sequence,
+            "correct_answer": question.correct_answer if closed else ""
+        }
+    
+    def _score_answer(self, question: GameQuestion, player: Player, is_correct: bool) -> int:
+        """Update a player's stats for one answer and return the points earned"""
         player.total_answers += 1
         
         if is_correct:
             player.correct_answers += 1
             player.streak += 1
             # Base points + streak bonus
-            points = self.current_question.points + (player.streak - 1) * 2
+            points = question.points + (player.streak - 1) * 2
             player.score += points
         else:
             player.streak = 0
             points = 0
+        return points
+    
+    def _close_question(self, question: GameQuestion, answered_correctly: bool) -> None:
+        """Tally the question for analytics and move it to history"""
+        official = question.official
+        result = self.official_results.setdefault(
+            official.id, {"official_id": official.id, "name": official.name, "asked": 0, "correct": 0}
+        )
+        result["asked"] += 1
+        if answered_correctly:
+            result["correct"] += 1
         
-        # Move question to history
-        self.question_history.append(self.current_question)
+        self.question_history.append(question)
         self.current_question = None
-        
-        return {
-            "success": True,
-            "correct": is_correct,
-            "points_earned": points,
-            "player_score": player.score,
-            "streak": player.streak,
-            "correct_answer": self.current_question.correct_answer if self.current_question else ""
-        }
     
     def get_leaderboard(self) -> List[Dict[str, Any]]:
         """Get current leaderboard"""
+        with self.game_lock:
+            return self._leaderboard()
+    
+    def _leaderboard(self) -> List[Dict[str, Any]]:
         sorted_players = sorted(self.players, key=lambda p: p.score, reverse=True)
         return [
             {
@@ -240,26 +614,54 @@ class GameService:
     
     def get_game_stats(self) -> Dict[str, Any]:
         """Get overall game statistics"""
+        stats = self.catalog.stats
         return {
-            "total_officials": len(self.officials),
-            "real_officials": len([o for o in self.officials if not o.is_fake]),
-            "fake_photos": len([o for o in self.officials if o.is_fake]),
+            "total_officials": stats.total,
+            "real_officials": stats.real,
+            "fake_photos": stats.fake,
             "questions_asked": len(self.question_history),
             "game_active": self.game_active,
             "players_count": len(self.players)
         }
     
-    def end_game(self) -> Dict[str, Any]:
-        """End the current game session"""
-        self.game_active = False
-        final_leaderboard = self.get_leaderboard()
+    def get_versions(self) -> Dict[str, int]:
+        """Current catalog and session versions, for cache keys"""
+        return {"catalog": self.catalog_version, "session": self.session_version}
+    
+    def get_catalog_stats(self) -> Dict[str, Any]:
+        """Get catalog aggregates, including per-category and per-state counts"""
+        return self.catalog_stats.to_dict()
+    
+    @staticmethod
+    def _winner(final_leaderboard: List[Dict[str, Any]], total_questions: int) -> Optional[Dict[str, Any]]:
+        """The outright top scorer - nobody wins a game with no questions, no points or a tie at the top"""
+        if not total_questions or not final_leaderboard or final_leaderboard[0]["score"] <= 0:
+            return None
+        if len(final_leaderboard) > 1 and final_leaderboard[1]["score"] == final_leaderboard[0]["score"]:
+            return None
+        return final_leaderboard[0]
+    
+    def end_game(self, on_finished: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """End the current game session
         
-        # Game summary
-        summary = {
-            "final_scores": final_leaderboard,
-            "total_questions": len(self.question_history),
-            "game_duration": len(self.question_history),  # Simple metric
-            "winner": final_leaderboard[0] if final_leaderboard else None
-        }
+        on_finished is called with the summary only by the call that actually
+        ended an active game, so concurrent end requests can't double-record it.
+        """
+        with self.game_lock:
+            was_active = self.game_active
+            self.game_active = False
+            self.session_version += 1
+            final_leaderboard = self._leaderboard()
+            
+            # Game summary
+            summary = {
+                "final_scores": final_leaderboard,
+                "total_questions": len(self.question_history),
+                "game_duration": len(self.question_history),  # Simple metric
+                "winner": self._winner(final_leaderboard, len(self.question_history)),
+                "official_results": list(self.official_results.values())
+            }
         
+        if was_active and on_finished:
+            on_finished(summary)
         return summary
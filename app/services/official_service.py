@@ -5,10 +5,21 @@ Official Service for managing government officials data
 
 import os
 import json
+from tempfile import SpooledTemporaryFile
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
+
+
+# Upload limits - keep peak memory per upload small and predictable
+MAX_UPLOAD_BYTES = 15 * 1024 * 1024      # Raw upload size cap
+UPLOAD_CHUNK_BYTES = 64 * 1024           # Read uploads in chunks of this size
+UPLOAD_SPOOL_BYTES = 1024 * 1024         # Buffer in memory up to this, then spill to disk
+MAX_SOURCE_PIXELS = 60_000_000           # Reject anything larger than this before decoding
+MAX_DECODE_BYTES = 48 * 1024 * 1024      # Budget for the decoded bitmap (after draft scaling)
+MAX_PHOTO_WIDTH = 800
+SUPPORTED_PHOTO_FORMATS = ("JPEG", "PNG", "GIF")
 
 
 class OfficialService:
@@ -25,6 +36,27 @@ class OfficialService:
         os.makedirs(self.photos_dir, exist_ok=True)
         os.makedirs(self.officials_dir, exist_ok=True)
     
+    def spool_upload(self, photo_file, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledTemporaryFile:
+        """Copy an upload into a bounded buffer, rejecting it as soon as it exceeds max_bytes"""
+        stream = getattr(photo_file, 'stream', photo_file)
+        buffer = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        size = 0
+        try:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Photo exceeds {max_bytes // (1024 * 1024)} MB upload limit")
+                buffer.write(chunk)
+        except Exception:
+            buffer.close()
+            raise
+        
+        buffer.seek(0)
+        return buffer
+    
     def save_photo(self, photo_file, filename: str) -> str:
         """Save and optimize uploaded photo"""
         # Secure the filename
@@ -34,32 +66,77 @@ class OfficialService:
         
         photo_path = os.path.join(self.photos_dir, filename)
         
-        # Save and optimize the image
-        try:
-            # Open and process image
-            image = Image.open(photo_file)
-            
-            # Convert to RGB if needed
-            if image.mode in ('RGBA', 'LA', 'P'):
-                image = image.convert('RGB')
-            
-            # Resize if too large (max 800px width, maintain aspect ratio)
-            if image.width > 800:
-                ratio = 800 / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((800, new_height), Image.Resampling.LANCZOS)
-            
-            # Save optimized image
-            image.save(photo_path, 'JPEG', quality=85, optimize=True)
-            
-            # Return relative path for storage
-            return f"photos/{filename}"
+        stream = getattr(photo_file, 'stream', photo_file)
+        if getattr(stream, 'seekable', lambda: False)():
+            # Werkzeug has already buffered the upload (within MAX_CONTENT_LENGTH) - decode it in place
+            stream.seek(0, os.SEEK_END)
+            if stream.tell() > MAX_UPLOAD_BYTES:
+                raise ValueError(f"Photo exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit")
+            stream.seek(0)
+            image = self._decode_upload(stream)
+        else:
+            # Pillow needs to seek; buffer one-way streams with the same cap
+            with self.spool_upload(stream) as upload:
+                image = self._decode_upload(upload)
         
+        # Save optimized image
+        image.save(photo_path, 'JPEG', quality=85, optimize=True)
+        
+        # Return relative path for storage
+        return f"photos/{filename}"
+    
+    def _decode_upload(self, upload) -> Image.Image:
+        try:
+            return self.decode_photo(upload)
+        except ValueError:
+            raise
         except Exception as e:
+            # Never store bytes Pillow could not decode - they may not be an image at all
             print(f"Error processing photo: {e}")
-            # Fallback: save original file
-            photo_file.save(photo_path)
-            return f"photos/{filename}"
+            raise ValueError("Unsupported or corrupt image") from e
+    
+    def decode_photo(self, upload) -> Image.Image:
+        """Decode an upload at (close to) its final size
+        
+        Only the header is parsed before the size checks; JPEGs are then
+        decoded in draft mode straight to the smallest DCT scale that still
+        covers the target width, so a phone photo never decodes at full size.
+        """
+        try:
+            image = Image.open(upload, formats=SUPPORTED_PHOTO_FORMATS)
+        except Image.DecompressionBombError as e:
+            raise ValueError("Photo dimensions are too large") from e
+        except UnidentifiedImageError as e:
+            raise ValueError("Unsupported or corrupt image") from e
+        
+        # Decompression-bomb guard: refuse oversized images before decoding any pixels.
+        # This limit is below Pillow's own warning threshold, so warnings need no handling.
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise ValueError("Photo dimensions are too large")
+        
+        target_size = image.size
+        if image.width > MAX_PHOTO_WIDTH:
+            ratio = MAX_PHOTO_WIDTH / image.width
+            target_size = (MAX_PHOTO_WIDTH, max(int(image.height * ratio), 1))
+            # JPEG only; a no-op for other formats
+            image.draft('RGB', target_size)
+        
+        # Whatever is left to decode must fit the per-upload memory budget
+        bands = len(image.getbands())
+        if image.width * image.height * bands > MAX_DECODE_BYTES:
+            raise ValueError("Photo is too large to process")
+        
+        image.load()
+        
+        # Convert to RGB if needed
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGB')
+        
+        # Resize if too large (max 800px width, maintain aspect ratio)
+        if image.size != target_size:
+            image = image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        
+        return image
     
     def get_sample_officials(self) -> List[Dict[str, Any]]:
         """Get sample officials data for initial setup"""
@@ -174,9 +251,17 @@ class OfficialService:
         # Required fields
         required_fields = ['name', 'position', 'state']
         for field in required_fields:
-            if not data.get(field, '').strip():
+            value = data.get(field)
+            if not isinstance(value, str) or not value.strip():
                 errors.append(f"{field} is required")
         
+        if data.get('fun_fact') is not None and not isinstance(data['fun_fact'], str):
+            errors.append("fun_fact must be text")
+        
+        # JSON clients must send a real boolean - "no" would otherwise count as fake
+        if 'is_fake' in data and not isinstance(data['is_fake'], bool):
+            errors.append("is_fake must be true or false")
+        
         # State validation
         if data.get('state') and data['state'] not in self.get_states():
             errors.append("Invalid state")
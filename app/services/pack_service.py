@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Pack Service for Guess That Official
+Exports, imports and mounts "game packs" - single-archive catalogs with photos
+"""
+
+import io
+import os
+import json
+import shutil
+import threading
+import zipfile
+from datetime import datetime
+from dataclasses import astuple, fields
+from typing import Dict, List, Any, Optional, Set, Tuple
+from werkzeug.utils import secure_filename
+from PIL import Image
+
+from app.services.game_service import Official
+from app.services.official_service import (
+    OfficialService, MAX_PHOTO_WIDTH, MAX_SOURCE_PIXELS, MAX_UPLOAD_BYTES, SUPPORTED_PHOTO_FORMATS, UPLOAD_CHUNK_BYTES
+)
+
+
+PACK_FORMAT_VERSION = 1
+PACK_EXTENSION = ".pack"
+MANIFEST_NAME = "pack.json"
+CATALOG_NAME = "catalog.json"
+OFFICIAL_FIELDS = [f.name for f in fields(Official)]
+MAX_PACK_BYTES = 1024 * 1024 * 1024     # Uploaded pack archive size cap
+# Uncompressed size caps for members of an untrusted (possibly deflated) archive
+MAX_MANIFEST_BYTES = 64 * 1024
+MAX_CATALOG_BYTES = 64 * 1024 * 1024
+MAX_PACK_PHOTO_BYTES = MAX_UPLOAD_BYTES
+PHOTO_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif"}
+PHOTO_MIMETYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif"}
+
+
+class PackService:
+    """Portable game packs: a zip (stored, not deflated) holding a manifest,
+    a compact catalog (field names once, then one row per official) and
+    ready-to-serve photo derivatives"""
+
+    def __init__(self, official_service: OfficialService):
+        self.official_service = official_service
+        self.photos_dir = official_service.photos_dir
+        self.packs_dir = os.path.join(official_service.data_dir, "packs")
+        self.mounted: Dict[str, zipfile.ZipFile] = {}
+        # Members of each mounted pack that its catalog references as photos
+        self.mounted_photos: Dict[str, Set[str]] = {}
+        self.mount_lock = threading.Lock()
+        os.makedirs(self.packs_dir, exist_ok=True)
+
+    def pack_path(self, pack_id: str) -> str:
+        """Location of a pack archive in the packs directory"""
+        return os.path.join(self.packs_dir, secure_filename(pack_id) + PACK_EXTENSION)
+
+    def list_packs(self) -> List[Dict[str, Any]]:
+        """Available pack archives and whether each is mounted"""
+        packs = []
+        for filename in sorted(os.listdir(self.packs_dir)):
+            if not filename.endswith(PACK_EXTENSION):
+                continue
+            pack_id = filename[:-len(PACK_EXTENSION)]
+            try:
+                with zipfile.ZipFile(os.path.join(self.packs_dir, filename)) as archive:
+                    manifest = json.loads(archive.read(MANIFEST_NAME))
+            except Exception as e:
+                print(f"Error reading pack {filename}: {e}")
+                continue
+            packs.append({**manifest, "id": pack_id, "mounted": pack_id in self.mounted})
+        return packs
+
+    def _photo_bytes(self, photo_path: str) -> Optional[bytes]:
+        """Photo as it should ship in a pack - re-encoded only if not already web-sized"""
+        source = os.path.join(self.official_service.data_dir, photo_path)
+        if not os.path.isfile(source):
+            return None
+
+        with open(source, 'rb') as f:
+            try:
+                with Image.open(f) as image:
+                    needs_derivative = image.format != 'JPEG' or image.width > MAX_PHOTO_WIDTH
+                if needs_derivative:
+                    f.seek(0)
+                    derivative = io.BytesIO()
+                    self.official_service.decode_photo(f).save(derivative, 'JPEG', quality=85, optimize=True)
+                    return derivative.getvalue()
+            except Exception as e:
+                print(f"Error building pack photo for {photo_path}: {e}")
+
+            # Already web-sized (or not decodable) - ship it as is
+            f.seek(0)
+            return f.read()
+
+    def export_pack(self, pack_id: str, officials: List[Official], title: str = "") -> str:
+        """Write officials and their photos to a pack archive and return its path"""
+        path = self.pack_path(pack_id)
+        rows = []
+        written = set()
+
+        with zipfile.ZipFile(path + ".tmp", 'w', compression=zipfile.ZIP_STORED) as archive:
+            for official in officials:
+                row = list(astuple(official))
+                member = "photos/" + os.path.basename(official.photo_path)
+                if member not in written:
+                    data = self._photo_bytes(official.photo_path)
+                    if data is not None:
+                        archive.writestr(member, data)
+                        written.add(member)
+                if member in written:
+                    row[OFFICIAL_FIELDS.index('photo_path')] = member
+                rows.append(row)
+
+            catalog = {"fields": OFFICIAL_FIELDS, "rows": rows}
+            archive.writestr(CATALOG_NAME, json.dumps(catalog, separators=(',', ':')))
+            archive.writestr(MANIFEST_NAME, json.dumps({
+                "title": title or pack_id,
+                "format": PACK_FORMAT_VERSION,
+                "officials": len(rows),
+                "photos": len(written),
+                "created": datetime.now().isoformat()
+            }, indent=2))
+
+        os.replace(path + ".tmp", path)
+        return path
+
+    @staticmethod
+    def _read_member(archive: zipfile.ZipFile, name: str, max_bytes: int) -> bytes:
+        """Read a member, refusing it before inflating if it claims to be too big"""
+        if archive.getinfo(name).file_size > max_bytes:
+            raise ValueError(f"Pack member {name} is too large")
+        return archive.read(name)
+
+    def _read_catalog(self, archive: zipfile.ZipFile) -> Tuple[Dict[str, Any], List[Official]]:
+        """Read manifest and catalog from an open archive, keeping only valid officials
+
+        Packs may come from anywhere, so every row goes through the same
+        validation as an official added in the admin UI.
+        """
+        manifest = json.loads(self._read_member(archive, MANIFEST_NAME, MAX_MANIFEST_BYTES))
+        if manifest.get("format") != PACK_FORMAT_VERSION:
+            raise ValueError(f"Unsupported pack format: {manifest.get('format')}")
+
+        catalog = json.loads(self._read_member(archive, CATALOG_NAME, MAX_CATALOG_BYTES))
+        known = set(OFFICIAL_FIELDS)
+        officials = []
+        skipped = 0
+        for row in catalog["rows"]:
+            record = {k: v for k, v in zip(catalog["fields"], row) if k in known}
+            if self._valid_record(record):
+                officials.append(Official(**record))
+            else:
+                skipped += 1
+        if skipped:
+            print(f"Skipped {skipped} invalid officials in pack")
+        return manifest, officials
+
+    def _valid_record(self, record: Dict[str, Any]) -> bool:
+        for key in ('id', 'photo_path'):
+            if not isinstance(record.get(key), str) or not record[key]:
+                return False
+        return self.official_service.validate_official_data(record)['valid']
+
+    @staticmethod
+    def _photo_format(archive: zipfile.ZipFile, member: str) -> Optional[str]:
+        """Image format of a pack member, or None unless it is a sound supported photo"""
+        try:
+            if archive.getinfo(member).file_size > MAX_PACK_PHOTO_BYTES:
+                return None
+            with archive.open(member) as f, Image.open(f, formats=SUPPORTED_PHOTO_FORMATS) as image:
+                if image.width * image.height > MAX_SOURCE_PIXELS:
+                    return None
+                image.verify()
+                return image.format
+        except Exception as e:
+            print(f"Rejected pack photo {member}: {e}")
+            return None
+
+    def save_upload(self, pack_file, pack_id: str) -> str:
+        """Store an uploaded pack archive in the packs directory"""
+        path = self.pack_path(pack_id)
+        # Werkzeug has already buffered the body; stream it straight to disk once
+        stream = getattr(pack_file, 'stream', pack_file)
+        size = 0
+        try:
+            with open(path + ".tmp", 'wb') as f:
+                while True:
+                    chunk = stream.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > MAX_PACK_BYTES:
+                        raise ValueError(f"Pack exceeds {MAX_PACK_BYTES // (1024 * 1024)} MB upload limit")
+                    f.write(chunk)
+        except Exception:
+            os.remove(path + ".tmp")
+            raise
+        if not zipfile.is_zipfile(path + ".tmp"):
+            os.remove(path + ".tmp")
+            raise ValueError("Not a game pack archive")
+        os.replace(path + ".tmp", path)
+        return path
+
+    def import_pack(self, pack_id: str) -> List[Official]:
+        """Copy a pack's photos into the photo library and return its officials
+
+        Photos are copied byte for byte - they were sized when the pack was
+        built - but only after Pillow has verified them, and always under the
+        extension of their real format. Officials without such a photo are
+        left out.
+        """
+        with zipfile.ZipFile(self.pack_path(pack_id)) as archive:
+            _, officials = self._read_catalog(archive)
+            members = set(archive.namelist())
+            copied: Dict[str, Optional[str]] = {}
+            imported = []
+
+            for official in officials:
+                member = official.photo_path
+                if member not in copied:
+                    image_format = self._photo_format(archive, member) if member in members else None
+                    copied[member] = (
+                        f"photos/{self._place_photo(archive, member, PHOTO_EXTENSIONS[image_format])}"
+                        if image_format else None
+                    )
+                if copied[member]:
+                    official.photo_path = copied[member]
+                    imported.append(official)
+
+        return imported
+
+    def _place_photo(self, archive: zipfile.ZipFile, member: str, extension: str) -> str:
+        """Copy a pack photo into the photo library and return its filename
+
+        An identical file already in the library is reused; a different one
+        with the same name is never overwritten - the copy gets a numbered name.
+        """
+        name = os.path.splitext(secure_filename(os.path.basename(member)))[0] or "photo"
+        filename = name + extension
+        n = 1
+        while os.path.exists(os.path.join(self.photos_dir, filename)):
+            if self._same_content(archive, member, os.path.join(self.photos_dir, filename)):
+                return filename
+            filename = f"{name}_{n}{extension}"
+            n += 1
+
+        with archive.open(member) as src, open(os.path.join(self.photos_dir, filename), 'wb') as dst:
+            shutil.copyfileobj(src, dst, UPLOAD_CHUNK_BYTES)
+        return filename
+
+    @staticmethod
+    def _same_content(archive: zipfile.ZipFile, member: str, path: str) -> bool:
+        if archive.getinfo(member).file_size != os.path.getsize(path):
+            return False
+        with archive.open(member) as packed, open(path, 'rb') as existing:
+            while True:
+                chunk = packed.read(UPLOAD_CHUNK_BYTES)
+                if chunk != existing.read(UPLOAD_CHUNK_BYTES):
+                    return False
+                if not chunk:
+                    return True
+
+    def mount_pack(self, pack_id: str) -> List[Official]:
+        """Open a pack read-only in place; photos are served straight from the archive"""
+        pack_id = secure_filename(pack_id)
+        archive = zipfile.ZipFile(self.pack_path(pack_id))
+        try:
+            _, officials = self._read_catalog(archive)
+        except Exception:
+            archive.close()
+            raise
+
+        members = set(archive.namelist())
+        photos = set()
+        for official in officials:
+            if official.photo_path in members:
+                photos.add(official.photo_path)
+                official.photo_path = f"packs/{pack_id}/{official.photo_path}"
+
+        with self.mount_lock:
+            previous = self.mounted.pop(pack_id, None)
+            self.mounted[pack_id] = archive
+            self.mounted_photos[pack_id] = photos
+        if previous:
+            previous.close()
+        return officials
+
+    def unmount_pack(self, pack_id: str) -> bool:
+        """Close a mounted pack"""
+        with self.mount_lock:
+            archive = self.mounted.pop(pack_id, None)
+            self.mounted_photos.pop(pack_id, None)
+        if not archive:
+            return False
+        archive.close()
+        return True
+
+    def read_photo(self, pack_id: str, member: str) -> Optional[Tuple[bytes, str]]:
+        """Read a photo out of a mounted pack as (data, mimetype)
+
+        Only members the catalog uses as photos are served, and only if they
+        really are a supported image - the archive itself is untrusted.
+        """
+        with self.mount_lock:
+            archive = self.mounted.get(pack_id)
+            if not archive or member not in self.mounted_photos.get(pack_id, ()):
+                return None
+            try:
+                data = self._read_member(archive, member, MAX_PACK_PHOTO_BYTES)
+            except (KeyError, ValueError):
+                return None
+
+        try:
+            with Image.open(io.BytesIO(data), formats=SUPPORTED_PHOTO_FORMATS) as image:
+                image.verify()
+                return data, PHOTO_MIMETYPES[image.format]
+        except Exception:
+            return None
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Profiling Service for Guess That Official
+Opt-in per-request profiling with a bounded ring of captured profiles
+"""
+
+import io
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from itertools import count
+from typing import Dict, List, Any, Optional
+
+
+PROFILE_HEADER = "X-Profile"
+MODES = ("cprofile", "sample")
+DEFAULT_ROUTES = ["/api/game/question", "/api/admin/official"]
+DEFAULT_RING_SIZE = 50
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples in sample mode
+COLLAPSED_MIN_SECONDS = 0.000001
+COLLAPSED_MAX_DEPTH = 128
+
+
+@dataclass
+class ProfileRecord:
+    """One captured request profile"""
+    id: int
+    method: str
+    path: str
+    mode: str
+    started_at: str
+    duration_ms: float = 0.0
+    status: Optional[int] = None
+    stats: Optional[Dict] = None  # cProfile stats dict (pstats format)
+    stacks: Counter = field(default_factory=Counter)  # Collapsed stack -> sample count
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "status": self.status,
+            "formats": ["pstats", "collapsed"] if self.mode == "cprofile" else ["collapsed"]
+        }
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+
+class ActiveProfile:
+    """Profiler attached to a request that is still running"""
+
+    def __init__(self, record: ProfileRecord):
+        self.record = record
+        self.started = time.perf_counter()
+        self.profiler: Optional[cProfile.Profile] = None
+        self.sampler: Optional[StackSampler] = None
+        if record.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+
+    def finish(self, status: Optional[int]) -> ProfileRecord:
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.create_stats()
+            self.record.stats = self.profiler.stats
+        if self.sampler:
+            self.record.stacks = self.sampler.stop()
+        self.record.duration_ms = (time.perf_counter() - self.started) * 1000
+        self.record.status = status
+        return self.record
+
+
+class ProfilingService:
+    """Decides which requests to profile and keeps the most recent profiles"""
+
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE):
+        self.enabled = False
+        self.routes: List[str] = list(DEFAULT_ROUTES)
+        self.mode = "cprofile"
+        self.profiles: deque = deque(maxlen=ring_size)
+        self.lock = threading.Lock()
+        self.next_id = count(1)
+        # Only one cProfile capture at a time: from Python 3.12 a second enable() raises
+        self.cprofile_lock = threading.Lock()
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "routes": self.routes,
+            "mode": self.mode,
+            "ring_size": self.profiles.maxlen,
+            "header": PROFILE_HEADER
+        }
+
+    def configure(self, enabled: Optional[bool] = None, routes: Optional[List[str]] = None,
+                  mode: Optional[str] = None) -> Dict[str, Any]:
+        """Admin toggle: turn route profiling on/off and choose routes and mode"""
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"Unknown profiling mode: {mode}")
+            self.mode = mode
+        if routes is not None:
+            self.routes = list(routes)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        return self.get_config()
+
+    def matches(self, path: str) -> bool:
+        """Route patterns are fnmatch-style, e.g. /api/game/*"""
+        return any(fnmatch(path, pattern) for pattern in self.routes)
+
+    def start(self, method: str, path: str, header_value: Optional[str]) -> Optional[ActiveProfile]:
+        """Start profiling a request if requested by header or the admin toggle
+
+        The header value may name the mode ("sample" or "cprofile"); any other
+        truthy value uses the configured mode.
+        """
+        header_value = (header_value or "").strip().lower()
+        requested = header_value not in ("", "0", "false", "off")
+        if not requested and not (self.enabled and self.matches(path)):
+            return None
+
+        mode = header_value if header_value in MODES else self.mode
+        if mode == "cprofile" and not self.cprofile_lock.acquire(blocking=False):
+            # Another request is being cProfiled - sample this one instead
+            mode = "sample"
+        record = ProfileRecord(
+            id=next(self.next_id),
+            method=method,
+            path=path,
+            mode=mode,
+            started_at=datetime.now().isoformat()
+        )
+        try:
+            return ActiveProfile(record)
+        except ValueError:
+            if mode != "cprofile":
+                raise
+            # Some other profiler (e.g. a debugger) owns the hook
+            self.cprofile_lock.release()
+            record.mode = "sample"
+            return ActiveProfile(record)
+
+    def finish(self, active: ActiveProfile, status: Optional[int] = None) -> ProfileRecord:
+        try:
+            record = active.finish(status)
+        finally:
+            if active.profiler:
+                self.cprofile_lock.release()
+        with self.lock:
+            self.profiles.append(record)
+        return record
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Captured profiles, newest first"""
+        with self.lock:
+            records = list(self.profiles)
+        return [record.summary() for record in reversed(records)]
+
+    def get_profile(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self.lock:
+            return next((record for record in self.profiles if record.id == profile_id), None)
+
+    def top_functions(self, record: ProfileRecord, limit: int = 20) -> str:
+        """Human-readable pstats report, sorted by cumulative time"""
+        if not record.stats:
+            return ""
+        output = io.StringIO()
+        stats = pstats.Stats(self._as_profile(record), stream=output)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+    def to_pstats(self, record: ProfileRecord) -> Optional[bytes]:
+        """Profile in the binary format read by pstats.Stats / snakeviz"""
+        if not record.stats:
+            return None
+        return marshal.dumps(record.stats)
+
+    def to_collapsed(self, record: ProfileRecord) -> str:
+        """Flamegraph-ready collapsed stacks ("a;b;c count" per line)
+
+        Sample mode has real stacks. For cProfile data, stacks are rebuilt
+        from the caller graph and weighted by each function's own time
+        (microseconds), which is exact for trees and approximate when a
+        function is reached from several callers.
+        """
+        if record.mode == "sample":
+            lines = [f"{stack} {samples}" for stack, samples in record.stacks.most_common()]
+            return "\n".join(lines) + "\n"
+
+        stacks = Counter()
+        stats = record.stats or {}
+
+        children: Dict[Any, List[Any]] = {}
+        for callee, (_, _, _, _, callers) in stats.items():
+            for caller in callers:
+                children.setdefault(caller, []).append(callee)
+
+        def label(func) -> str:
+            filename, line, name = func
+            return f"{name} ({filename}:{line})"
+
+        def walk(func, path: List[str], seen: set, share: float) -> None:
+            tottime, cumtime = stats[func][2], stats[func][3]
+            # Prune branches too small to show up in a flamegraph
+            if cumtime * share < COLLAPSED_MIN_SECONDS or len(path) >= COLLAPSED_MAX_DEPTH:
+                return
+            stack = path + [label(func)]
+            own = int(tottime * share * 1_000_000)
+            if own:
+                stacks[";".join(stack)] += own
+            for callee in children.get(func, []):
+                if callee in seen:
+                    continue
+                callee_cum = stats[callee][3] or 1e-12
+                # Split the callee's time across its callers by cumulative time contributed
+                callee_share = share * min(stats[callee][4][func][3] / callee_cum, 1.0)
+                seen.add(callee)
+                walk(callee, stack, seen, callee_share)
+                seen.discard(callee)
+
+        for root, (_, _, _, _, callers) in stats.items():
+            if not callers:
+                walk(root, [], {root}, 1.0)
+
+        lines = [f"{stack} {weight}" for stack, weight in stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _as_profile(record: ProfileRecord):
+        """Minimal stand-in accepted by pstats.Stats"""
+        class Snapshot:
+            def create_stats(self):
+                pass
+        snapshot = Snapshot()
+        snapshot.stats = record.stats
+        return snapshot
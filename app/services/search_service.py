@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Search Service for Guess That Official
+In-memory inverted index for prefix/typeahead lookup of officials
+"""
+
+import re
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+
+# Field weights used for ranking - a hit on the name beats a hit in a fun fact
+FIELD_WEIGHTS = {
+    "name": 8,
+    "position": 4,
+    "state": 4,
+    "category": 2,
+    "fun_fact": 1,
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Most vocabulary tokens a single query term may expand to - keeps one-character
+# prefixes from turning a typeahead lookup into a scan of the whole index
+MAX_PREFIX_EXPANSIONS = 128
+# Most documents one search checks; past this the best matches found so far are returned
+MAX_SCAN_CANDIDATES = 512
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower().replace("_", " "))
+
+
+class SearchIndex:
+    """Inverted index over official fields, maintained incrementally
+
+    copy() is cheap: posting buckets are shared with the original and only
+    copied when the new index first changes a token. The original must not
+    be modified after it has been copied.
+    """
+
+    def __init__(self):
+        # token -> {weight: {official_id: None}}, bucketed so ranking can stop early
+        self.postings: Dict[str, Dict[int, Dict[str, None]]] = {}
+        # Sorted vocabulary for prefix range scans
+        self.vocabulary: List[str] = []
+        # official_id -> {token: weight}, needed to remove stale postings
+        self.documents: Dict[str, Dict[str, int]] = {}
+        self.officials: Dict[str, Any] = {}
+        # Tokens whose buckets this index may modify; None means all of them
+        self.owned_tokens: Optional[Set[str]] = None
+
+    def copy(self) -> "SearchIndex":
+        """Copy-on-write clone for building the next catalog snapshot"""
+        clone = SearchIndex()
+        clone.postings = dict(self.postings)
+        clone.vocabulary = list(self.vocabulary)
+        clone.documents = dict(self.documents)
+        clone.officials = dict(self.officials)
+        clone.owned_tokens = set()
+        return clone
+
+    def _own(self, token: str) -> Optional[Dict[int, Dict[str, None]]]:
+        """Buckets for token, copied first if still shared with another index"""
+        buckets = self.postings.get(token)
+        if buckets is not None and self.owned_tokens is not None and token not in self.owned_tokens:
+            buckets = self.postings[token] = {weight: dict(ids) for weight, ids in buckets.items()}
+            self.owned_tokens.add(token)
+        return buckets
+
+    def _document_tokens(self, official) -> Dict[str, int]:
+        """Collect tokens and their combined field weight for an official"""
+        tokens: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(official, field, None) or ""):
+                tokens[token] = tokens.get(token, 0) + weight
+        return tokens
+
+    def add(self, official) -> None:
+        """Index an official, replacing any previous entry with the same id"""
+        if official.id in self.documents:
+            self.remove(official.id)
+
+        tokens = self._document_tokens(official)
+        for token, weight in tokens.items():
+            buckets = self._own(token)
+            if buckets is None:
+                buckets = self.postings[token] = {}
+                if self.owned_tokens is not None:
+                    self.owned_tokens.add(token)
+                insort(self.vocabulary, token)
+            buckets.setdefault(weight, {})[official.id] = None
+
+        self.documents[official.id] = tokens
+        self.officials[official.id] = official
+
+    def update(self, official) -> None:
+        """Re-index an official after its fields were edited"""
+        self.add(official)
+
+    def remove(self, official_id: str) -> None:
+        """Drop an official from the index"""
+        tokens = self.documents.pop(official_id, None)
+        self.officials.pop(official_id, None)
+        if not tokens:
+            return
+
+        for token, weight in tokens.items():
+            buckets = self._own(token)
+            if buckets is None:
+                continue
+            bucket = buckets.get(weight)
+            if bucket is not None:
+                bucket.pop(official_id, None)
+                if not bucket:
+                    del buckets[weight]
+            if not buckets:
+                del self.postings[token]
+                position = bisect_left(self.vocabulary, token)
+                if position < len(self.vocabulary) and self.vocabulary[position] == token:
+                    del self.vocabulary[position]
+
+    def rebuild(self, officials: Iterable) -> None:
+        """Rebuild the whole index from a list of officials"""
+        self.postings = {}
+        self.documents = {}
+        self.officials = {}
+        self.owned_tokens = None
+        for official in officials:
+            if official.id in self.documents:
+                # Duplicate id - let the later record win, as add() would
+                self.remove(official.id)
+            tokens = self._document_tokens(official)
+            for token, weight in tokens.items():
+                self.postings.setdefault(token, {}).setdefault(weight, {})[official.id] = None
+            self.documents[official.id] = tokens
+            self.officials[official.id] = official
+        self.vocabulary = sorted(self.postings)
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        """Indexed tokens starting with prefix, at most MAX_PREFIX_EXPANSIONS of them
+
+        Tokens are taken in sorted order, so an exact hit is always included
+        and a broad prefix matches only its first completions.
+        """
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(
+            self.vocabulary, prefix + "\uffff",
+            lo=start, hi=min(start + MAX_PREFIX_EXPANSIONS, len(self.vocabulary))
+        )
+        return self.vocabulary[start:end]
+
+    @staticmethod
+    def _score(token: str, term: str, weight: int) -> int:
+        # Exact token hits rank above prefix completions
+        return weight * 2 if token == term else weight
+
+    def _term_score(self, tokens: Dict[str, int], term: str, expansion: Set[str]) -> int:
+        """Best score a single document earns for a query term (0 if no match)"""
+        matched = expansion.intersection(tokens)
+        if not matched:
+            return 0
+        return max(self._score(token, term, tokens[token]) for token in matched)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Any, int]]:
+        """Return (official, score) pairs matching every term of the query
+
+        Work is bounded for typeahead: each term expands to at most
+        MAX_PREFIX_EXPANSIONS tokens and at most MAX_SCAN_CANDIDATES documents
+        are checked, so very broad queries return good matches, not all of them.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        # Per term: matching tokens, candidate count and best achievable score
+        ranges = {}
+        for term in terms:
+            tokens = self._prefix_tokens(term)
+            if not tokens:
+                return []
+            count = sum(len(bucket) for token in tokens for bucket in self.postings[token].values())
+            ceiling = max(self._score(token, term, max(self.postings[token])) for token in tokens)
+            ranges[term] = (tokens, count, ceiling)
+
+        # Drive the scan from the most selective term, check the rest per document
+        driver = min(terms, key=lambda term: ranges[term][1])
+        others = [(term, set(ranges[term][0])) for term in terms if term != driver]
+        others_ceiling = sum(ranges[term][2] for term, _ in others)
+
+        buckets = sorted(
+            (
+                (self._score(token, driver, weight), ids)
+                for token in ranges[driver][0]
+                for weight, ids in self.postings[token].items()
+            ),
+            key=lambda item: item[0],
+            reverse=True
+        )
+
+        budget = max(MAX_SCAN_CANDIDATES, 4 * limit)
+        seen = set()
+        top: List[Tuple[int, int, str]] = []  # min-heap of (total, -order, official_id)
+        order = 0
+        for driver_score, ids in buckets:
+            # Buckets are visited best-first, so nothing left can beat a full heap
+            if len(top) >= limit and top[0][0] >= driver_score + others_ceiling:
+                break
+            # Several common terms can share few documents - bound the scan either way
+            if len(seen) >= budget:
+                break
+            for official_id in ids:
+                if official_id in seen:
+                    continue
+                if len(seen) >= budget:
+                    break
+                seen.add(official_id)
+
+                total = driver_score
+                tokens = self.documents[official_id]
+                for term, expansion in others:
+                    score = self._term_score(tokens, term, expansion)
+                    if not score:
+                        break
+                    total += score
+                else:
+                    order += 1
+                    entry = (total, -order, official_id)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+
+                    if len(top) >= limit and top[0][0] >= driver_score + others_ceiling:
+                        break
+
+        ranked = sorted(top, key=lambda item: (-item[0], self.officials[item[2]].name.lower()))
+        return [(self.officials[official_id], total) for total, _, official_id in ranked]
+
+    def __len__(self) -> int:
+        return len(self.documents)
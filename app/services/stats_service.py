@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Stats Service for Guess That Official
+Catalog aggregates maintained incrementally as officials change
+"""
+
+from collections import Counter
+from typing import Dict, Any, Iterable
+
+
+class CatalogStats:
+    """Running counts over the officials catalog"""
+
+    def __init__(self):
+        self.total = 0
+        self.fake = 0
+        self.by_category: Counter = Counter()
+        self.by_state: Counter = Counter()
+
+    def copy(self) -> "CatalogStats":
+        """Independent copy for building the next catalog snapshot"""
+        clone = CatalogStats()
+        clone.total = self.total
+        clone.fake = self.fake
+        clone.by_category = Counter(self.by_category)
+        clone.by_state = Counter(self.by_state)
+        return clone
+
+    @property
+    def real(self) -> int:
+        return self.total - self.fake
+
+    def add(self, official) -> None:
+        """Count an official that joined the catalog"""
+        self.total += 1
+        if official.is_fake:
+            self.fake += 1
+        self.by_category[official.category] += 1
+        self.by_state[official.state] += 1
+
+    def remove(self, official) -> None:
+        """Uncount an official that left the catalog (or is about to be edited)"""
+        self.total -= 1
+        if official.is_fake:
+            self.fake -= 1
+        self._decrement(self.by_category, official.category)
+        self._decrement(self.by_state, official.state)
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str) -> None:
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def rebuild(self, officials: Iterable) -> None:
+        """Recount from scratch after a bulk load"""
+        self.__init__()
+        for official in officials:
+            self.add(official)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the catalog aggregates"""
+        return {
+            "total_officials": self.total,
+            "real_officials": self.real,
+            "fake_photos": self.fake,
+            "by_category": dict(self.by_category),
+            "by_state": dict(self.by_state)
+        }
@@ -209,7 +209,8 @@ function submitAnswer(answer, player, isCorrect) {
         },
         body: JSON.stringify({
             answer: answer,
-            player: player
+            player: player,
+            question_id: currentQuestion.question_id
         })
     })
     .then(response => response.json())
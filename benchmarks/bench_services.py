@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for GameService and OfficialService hot paths
+
+Builds synthetic catalogs (10 - 100k officials) and rooms (10 - 10k players),
+prints a scaling curve per operation and fails on regressions.
+
+Run from the project root:
+    python -m benchmarks.bench_services            # full run
+    python -m benchmarks.bench_services --quick    # smaller sizes, for a fast check
+    python -m benchmarks.bench_services --save-baseline bench_baseline.json
+    python -m benchmarks.bench_services --baseline bench_baseline.json
+"""
+
+import argparse
+import io
+import json
+import math
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Any, Tuple
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app.services.game_service import GameService, GameQuestion, Official
+from app.services.official_service import OfficialService
+
+
+CATALOG_SIZES = [10, 100, 1_000, 10_000, 100_000]
+PLAYER_COUNTS = [10, 100, 1_000, 10_000]
+PHOTO_SIZES = [(640, 480), (1920, 1080), (4000, 3000), (7000, 5700)]
+
+QUICK_CATALOG_SIZES = [10, 100, 1_000, 10_000]
+QUICK_PLAYER_COUNTS = [10, 100, 1_000]
+QUICK_PHOTO_SIZES = [(640, 480), (1920, 1080), (4000, 3000)]
+
+# Maximum allowed growth exponent (log-log slope of time vs. input size).
+# These encode the intended complexity, so they hold on any machine:
+# ~0 = constant, ~1 = linear.
+MAX_SLOPES = {
+    "generate_question": 1.2,
+    "answer_question": 0.35,
+    "get_leaderboard": 1.3,
+    "save_officials": 1.2,
+    "search_officials": 0.5,   # Grows until the expansion and scan caps kick in, then flat
+    "validate_official_data": 0.35,
+    "save_photo": 1.0,
+}
+
+# Against a saved baseline, fail if any point got this many times slower
+DEFAULT_TOLERANCE = 1.5
+
+TARGET_REPEAT_SECONDS = 0.05
+REPEATS = 5
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew"]
+LAST_NAMES = ["Smith", "Garcia", "Nguyen", "Patel", "Johnson", "Kim", "Brown", "Lopez", "Walker", "Young"]
+POSITIONS = ["Secretary of State", "Governor", "Senator", "Mayor", "Attorney General"]
+
+
+def synthetic_officials(data_dir: str, count: int, seed: int = 42) -> List[Official]:
+    """Deterministic catalog of fake officials, roughly 1 in 10 flagged as fake"""
+    rng = random.Random(seed)
+    official_service = OfficialService(data_dir=data_dir)
+    states = official_service.get_states()
+    categories = official_service.get_categories()
+    return [
+        Official(
+            id=f"bench_{i}",
+            name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+            position=rng.choice(POSITIONS),
+            state=rng.choice(states),
+            photo_path=f"photos/bench_{i}.jpg",
+            fun_fact=f"Synthetic official number {i}",
+            category=rng.choice(categories),
+            is_fake=i % 10 == 0
+        )
+        for i in range(count)
+    ]
+
+
+def time_per_call(func: Callable[[], Any], setup: Callable[[], None] = None) -> float:
+    """Best-of-REPEATS seconds per call; number of calls per repeat is auto-calibrated"""
+    def run(number: int) -> float:
+        elapsed = 0.0
+        for _ in range(number):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            func()
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= TARGET_REPEAT_SECONDS or number >= 100_000:
+            break
+        number *= 10 if elapsed < TARGET_REPEAT_SECONDS / 10 else 2
+
+    best = elapsed / number
+    for _ in range(REPEATS - 1):
+        best = min(best, run(number) / number)
+    return best
+
+
+def game_service_with_catalog(data_dir: str, officials: List[Official]) -> GameService:
+    """Fresh GameService in data_dir loaded with the given officials"""
+    service = GameService(data_dir=data_dir)
+    service.import_officials(officials)
+    return service
+
+
+def bench_generate_question(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    for size in sizes:
+        service = game_service_with_catalog(data_dir, synthetic_officials(data_dir, size))
+        service.setup_game(["Bench"])
+        curve.append((size, time_per_call(lambda: service.generate_question("multiple_choice"))))
+    return curve
+
+
+def bench_save_officials(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    for size in sizes:
+        service = game_service_with_catalog(data_dir, synthetic_officials(data_dir, size))
+        curve.append((size, time_per_call(service.save_officials)))
+    return curve
+
+
+# Broad prefixes and multi-term queries with few or no common matches are the worst case
+SEARCH_QUERIES = ["9", "1 2", "a b c", "smith 9", "gov"]
+
+
+def bench_search_officials(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    for size in sizes:
+        service = game_service_with_catalog(data_dir, synthetic_officials(data_dir, size))
+        position = [0]
+
+        def search():
+            position[0] = (position[0] + 1) % len(SEARCH_QUERIES)
+            service.search_officials(SEARCH_QUERIES[position[0]])
+
+        curve.append((size, time_per_call(search)))
+    return curve
+
+
+def room(data_dir: str, players: int) -> Tuple[GameService, List[str]]:
+    """A game with the given number of players and a small catalog"""
+    service = game_service_with_catalog(data_dir, synthetic_officials(data_dir, 50))
+    names = [f"Player {i}" for i in range(players)]
+    service.setup_game(names)
+    return service, names
+
+
+def bench_answer_question(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    for size in sizes:
+        service, names = room(data_dir, size)
+        official = service.officials[0]
+        rng = random.Random(7)
+
+        def setup():
+            service.current_question = GameQuestion(
+                question_type="multiple_choice", official=official, correct_answer=official.id, question_id=1
+            )
+
+        def answer():
+            service.answer_question(official.id, rng.choice(names), 1)
+
+        curve.append((size, time_per_call(answer, setup)))
+    return curve
+
+
+def bench_get_leaderboard(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    for size in sizes:
+        service, _ = room(data_dir, size)
+        rng = random.Random(7)
+        for player in service.players:
+            player.score = rng.randint(0, 500)
+            player.total_answers = rng.randint(1, 50)
+            player.correct_answers = rng.randint(0, player.total_answers)
+        curve.append((size, time_per_call(service.get_leaderboard)))
+    return curve
+
+
+def bench_validate_official_data(data_dir: str, sizes: List[int]) -> List[Tuple[int, float]]:
+    curve = []
+    service = OfficialService(data_dir=data_dir)
+    for size in sizes:
+        # Validation does not depend on catalog size; cycle through records to confirm it stays flat
+        records = [
+            {"name": o.name, "position": o.position, "state": o.state, "category": o.category}
+            for o in synthetic_officials(data_dir, min(size, 1_000))
+        ]
+        position = [0]
+
+        def validate():
+            position[0] = (position[0] + 1) % len(records)
+            service.validate_official_data(records[position[0]])
+
+        curve.append((size, time_per_call(validate)))
+    return curve
+
+
+def bench_save_photo(data_dir: str, sizes: List[Tuple[int, int]]) -> List[Tuple[int, float]]:
+    curve = []
+    service = OfficialService(data_dir=data_dir)
+    for width, height in sizes:
+        # A gradient compresses like a real photo far better than a flat colour
+        gradient = Image.linear_gradient('L').resize((width, height))
+        image = Image.merge('RGB', (gradient, gradient.transpose(Image.Transpose.ROTATE_90).resize((width, height)), gradient))
+        encoded = io.BytesIO()
+        image.save(encoded, 'JPEG', quality=90)
+        data = encoded.getvalue()
+
+        def save():
+            service.save_photo(FileStorage(io.BytesIO(data), "bench.jpg"), "bench.jpg")
+
+        curve.append((width * height, time_per_call(save)))
+    return curve
+
+
+def slope(curve: List[Tuple[int, float]]) -> float:
+    """Growth exponent between the smallest and largest input size"""
+    (n0, t0), (n1, t1) = curve[0], curve[-1]
+    if n1 == n0 or t0 <= 0:
+        return 0.0
+    return math.log(t1 / t0) / math.log(n1 / n0)
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def print_curve(name: str, curve: List[Tuple[int, float]], unit: str) -> None:
+    print(f"\n📈 {name} (time per call vs. {unit})")
+    for size, seconds in curve:
+        print(f"   {size:>12,}  {format_seconds(seconds)}")
+    print(f"   growth exponent: {slope(curve):.2f} (max {MAX_SLOPES[name]})")
+
+
+def check_regressions(results: Dict[str, List[Tuple[int, float]]], baseline: Dict[str, Any],
+                      tolerance: float) -> List[str]:
+    """Compare against complexity ceilings and, if given, a saved baseline"""
+    failures = []
+    for name, curve in results.items():
+        growth = slope(curve)
+        if growth > MAX_SLOPES[name]:
+            failures.append(f"{name}: growth exponent {growth:.2f} exceeds {MAX_SLOPES[name]}")
+
+        previous = dict((int(size), seconds) for size, seconds in baseline.get(name, []))
+        for size, seconds in curve:
+            if size in previous and seconds > previous[size] * tolerance:
+                failures.append(
+                    f"{name} @ {size:,}: {format_seconds(seconds).strip()} vs baseline "
+                    f"{format_seconds(previous[size]).strip()} (> {tolerance}x)"
+                )
+    return failures
+
+
+def main() -> None:
+    """Run all benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark GameService and OfficialService hot paths")
+    parser.add_argument("--quick", action="store_true", help="Use smaller catalogs, rooms and photos")
+    parser.add_argument("--only", nargs="+", choices=sorted(MAX_SLOPES), help="Run only these benchmarks")
+    parser.add_argument("--baseline", help="Fail if slower than this saved baseline (JSON)")
+    parser.add_argument("--save-baseline", help="Write results to this file as a new baseline (JSON)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown factor vs. baseline (default {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    catalog_sizes = QUICK_CATALOG_SIZES if args.quick else CATALOG_SIZES
+    player_counts = QUICK_PLAYER_COUNTS if args.quick else PLAYER_COUNTS
+    photo_sizes = QUICK_PHOTO_SIZES if args.quick else PHOTO_SIZES
+
+    benchmarks = [
+        ("generate_question", bench_generate_question, catalog_sizes, "officials"),
+        ("save_officials", bench_save_officials, catalog_sizes, "officials"),
+        ("search_officials", bench_search_officials, catalog_sizes, "officials"),
+        ("validate_official_data", bench_validate_official_data, catalog_sizes, "officials"),
+        ("answer_question", bench_answer_question, player_counts, "players"),
+        ("get_leaderboard", bench_get_leaderboard, player_counts, "players"),
+        ("save_photo", bench_save_photo, photo_sizes, "source pixels"),
+    ]
+
+    print("🚀 Benchmarking Guess That Official services")
+    print("=" * 50)
+
+    results: Dict[str, List[Tuple[int, float]]] = {}
+    for name, bench, sizes, unit in benchmarks:
+        if args.only and name not in args.only:
+            continue
+        data_dir = tempfile.mkdtemp(prefix="bench_")
+        try:
+            results[name] = bench(data_dir, sizes)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        print_curve(name, results[name], unit)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    failures = check_regressions(results, baseline, args.tolerance)
+
+    print("\n" + "=" * 50)
+    if failures:
+        print("❌ Performance regressions:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("🎉 All benchmarks within thresholds.")
+
+
+if __name__ == "__main__":
+    main()
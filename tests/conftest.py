@@ -0,0 +1,29 @@
+"""Shared fixtures for the service tests"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.game_service import GameService, Official
+from app.services.official_service import OfficialService
+
+
+def make_official(official_id: str, name: str, position: str = "Governor", state: str = "Texas",
+                  category: str = "governor", **fields) -> Official:
+    return Official(id=official_id, name=name, position=position, state=state,
+                    photo_path=f"photos/{official_id}.jpg", category=category, **fields)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return str(tmp_path / "data")
+
+
+@pytest.fixture
+def game_service(data_dir):
+    """GameService over the sample catalog, with no watcher thread"""
+    OfficialService(data_dir=data_dir).create_sample_data()
+    return GameService(data_dir=data_dir)
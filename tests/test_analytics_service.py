@@ -0,0 +1,99 @@
+"""Tests for game history and its rollups"""
+
+from contextlib import closing
+from datetime import datetime
+
+import pytest
+
+from app.services.analytics_service import AnalyticsService, week_key
+
+
+def summary(scores, officials=(), questions=5):
+    final_scores = [{"name": name, "score": score, "correct": correct, "total": total}
+                    for name, score, correct, total in scores]
+    winner = max(final_scores, key=lambda player: player["score"]) if final_scores else None
+    return {
+        "final_scores": final_scores,
+        "total_questions": questions,
+        "winner": winner,
+        "official_results": [{"official_id": official_id, "name": official_id.upper(), "asked": asked,
+                              "correct": correct} for official_id, asked, correct in officials]
+    }
+
+
+WEEK_ONE = datetime(2025, 1, 6)
+WEEK_TWO = datetime(2025, 1, 13)
+
+
+@pytest.fixture
+def analytics(data_dir):
+    service = AnalyticsService(data_dir=data_dir)
+    service.record_game(summary([("Bob", 30, 3, 5), ("Al", 10, 1, 5)], [("tx_gov", 2, 0), ("ny_gov", 3, 3)]),
+                        played_at=WEEK_ONE)
+    service.record_game(summary([("Bob", 5, 1, 4), ("Al", 20, 2, 4)], [("tx_gov", 2, 1)], questions=4),
+                        played_at=WEEK_ONE)
+    service.record_game(summary([("Al", 40, 4, 4)], [("ny_gov", 1, 1)], questions=4), played_at=WEEK_TWO)
+    return service
+
+
+def test_week_key():
+    assert week_key(WEEK_ONE) == "2025-W02"
+    assert week_key(datetime(2024, 12, 30)) == "2025-W01"
+
+
+def test_season_leaderboard_totals(analytics):
+    leaderboard = analytics.get_season_leaderboard()
+    assert [(row["name"], row["games"], row["wins"], row["score"]) for row in leaderboard] == [
+        ("Al", 3, 2, 70),
+        ("Bob", 2, 1, 35),
+    ]
+    assert leaderboard[0]["accuracy"] == round(7 / 13 * 100, 1)
+
+    week_one = analytics.get_season_leaderboard("2025-W02", "2025-W02")
+    assert [(row["name"], row["games"], row["score"]) for row in week_one] == [("Bob", 2, 35), ("Al", 2, 30)]
+
+
+def test_rollups_match_per_game_rows(analytics):
+    with closing(analytics._connect()) as connection:
+        raw = connection.execute(
+            "SELECT player, COUNT(*), SUM(score), SUM(correct), SUM(total), MAX(score) "
+            "FROM player_results GROUP BY player ORDER BY player"
+        ).fetchall()
+        rollup = connection.execute(
+            "SELECT player, games, score, correct, total, best_score FROM player_rollup ORDER BY player"
+        ).fetchall()
+    assert [tuple(row) for row in raw] == [tuple(row) for row in rollup]
+
+
+def test_player_history(analytics):
+    history = analytics.get_player_history("Bob")
+    assert (history["games"], history["wins"], history["score"], history["best_score"]) == (2, 1, 35, 30)
+    assert [(week["week"], week["games"]) for week in history["weeks"]] == [("2025-W02", 2)]
+    assert analytics.get_player_history("Nobody") == {}
+
+
+def test_hardest_officials_and_weeks(analytics):
+    hardest = analytics.get_hardest_officials(min_asked=3)
+    assert [(row["official_id"], row["asked"], row["correct"]) for row in hardest] == [
+        ("tx_gov", 4, 1),
+        ("ny_gov", 4, 4),
+    ]
+    assert analytics.get_weekly_summary() == [
+        {"week": "2025-W03", "games": 1, "questions": 4},
+        {"week": "2025-W02", "games": 2, "questions": 9},
+    ]
+
+
+def test_repeated_player_names_are_folded(data_dir):
+    service = AnalyticsService(data_dir=data_dir)
+    service.record_game(summary([("Bob", 10, 1, 2), ("Bob", 5, 1, 1)]), played_at=WEEK_ONE)
+    history = service.get_player_history("Bob")
+    assert (history["games"], history["score"], history["accuracy"]) == (1, 15, round(2 / 3 * 100, 1))
+
+
+def test_unplayed_or_pointless_games_credit_no_win(data_dir):
+    service = AnalyticsService(data_dir=data_dir)
+    service.record_game(summary([("a", 0, 0, 0)], questions=0), played_at=WEEK_ONE)
+    service.record_game(summary([("a", 0, 0, 3)], questions=3), played_at=WEEK_ONE)
+    history = service.get_player_history("a")
+    assert (history["games"], history["wins"]) == (2, 0)
@@ -0,0 +1,68 @@
+"""Tests for the rendered-page cache and the versions it is keyed on"""
+
+from app.services.cache_service import FragmentCache
+
+
+def test_hits_and_misses():
+    cache = FragmentCache(max_entries=4)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return "<p>page</p>"
+
+    assert cache.get_or_render("a", render) == "<p>page</p>"
+    assert cache.get_or_render("a", render) == "<p>page</p>"
+    assert len(renders) == 1
+    assert cache.stats() == {"entries": 1, "max_entries": 4, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FragmentCache(max_entries=2)
+    cache.get_or_render("a", lambda: "A")
+    cache.get_or_render("b", lambda: "B")
+    cache.get_or_render("a", lambda: "stale")  # a is now the most recently used
+    cache.get_or_render("c", lambda: "C")
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get_or_render("b", lambda: "B again") == "B again"
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_new_version_renders_fresh_page(game_service):
+    cache = FragmentCache()
+
+    def page():
+        key = ("index", game_service.catalog_version, game_service.session_version)
+        return cache.get_or_render(key, lambda: str(game_service.get_game_stats()["questions_asked"]))
+
+    game_service.setup_game(["Bob"])
+    assert page() == "0"
+    question = game_service.generate_question("multiple_choice")
+    game_service.answer_question(question.correct_answer, "Bob", question.question_id)
+    assert page() == "1"
+
+    game_service.add_official("Greg Abbott", "Governor", "Texas", "photos/a.jpg")
+    assert page() == "1"
+    assert cache.stats()["misses"] == 3
+
+
+def test_session_version_moves_after_the_answer_is_recorded(game_service, monkeypatch):
+    game_service.setup_game(["Bob", "Al"], buzzer_mode=True)
+    versions = []
+    close = game_service._close_question
+
+    def recording_close(question, answered_correctly):
+        versions.append(game_service.session_version)
+        close(question, answered_correctly)
+
+    monkeypatch.setattr(game_service, "_close_question", recording_close)
+    question = game_service.generate_question("multiple_choice")
+    before = game_service.session_version
+    game_service.answer_question(question.correct_answer, "Bob", question.question_id)
+
+    # A render keyed on the new version must already see the closed question
+    assert versions == [before]
+    assert game_service.session_version == before + 1
@@ -0,0 +1,109 @@
+"""Tests for copy-on-write catalog snapshots and hot reload"""
+
+import json
+import threading
+import time
+
+from app.services.catalog_service import CatalogWatcher, file_signature
+from conftest import make_official
+
+
+def test_edit_publishes_new_snapshot(game_service):
+    before = game_service.catalog
+    official = before.officials[0]
+    assert official.category != "mayor" and not official.is_fake
+
+    assert game_service.update_official(official.id, name="Renamed Person", category="mayor", is_fake=True)
+
+    after = game_service.catalog
+    assert after.version == before.version + 1
+    assert after.by_id[official.id].name == "Renamed Person"
+    assert after.stats.by_category["mayor"] == before.stats.by_category["mayor"] + 1
+    assert after.stats.by_category[official.category] == before.stats.by_category[official.category] - 1
+    assert after.stats.fake == before.stats.fake + 1
+    assert after.search_index.search("renamed")[0][0].id == official.id
+
+    # Readers holding the old snapshot still see the old catalog
+    assert before.by_id[official.id] is official
+    assert before.stats.fake == after.stats.fake - 1
+    assert before.search_index.search("renamed") == []
+
+
+def test_stats_follow_mount_and_unmount(game_service):
+    before = game_service.get_catalog_stats()
+    game_service.mount_officials("pack", [make_official("m1", "Mounted One", category="mayor", is_fake=True)])
+
+    mounted = game_service.get_catalog_stats()
+    assert mounted["total_officials"] == before["total_officials"] + 1
+    assert mounted["fake_photos"] == before["fake_photos"] + 1
+    assert mounted["by_category"]["mayor"] == before["by_category"].get("mayor", 0) + 1
+
+    game_service.unmount_officials("pack")
+    assert game_service.get_catalog_stats() == before
+
+
+def test_reload_picks_up_external_edit(game_service):
+    watcher = CatalogWatcher(game_service.officials_file, lambda: game_service.catalog_file_signature,
+                             game_service.load_officials)
+    before = game_service.catalog
+    assert not watcher.check()
+
+    with open(game_service.officials_file) as f:
+        data = json.load(f)
+    data["officials"][0]["name"] = "Edited Outside The App"
+    data["officials"] = data["officials"][:3]
+    with open(game_service.officials_file, "w") as f:
+        json.dump(data, f)
+
+    assert watcher.check()
+    after = game_service.catalog
+    assert after is not before
+    assert [o.name for o in after.officials][0] == "Edited Outside The App"
+    assert after.stats.total == len(after.search_index) == 3
+    assert game_service.catalog_file_signature == file_signature(game_service.officials_file)
+    assert not watcher.check()
+
+    # The superseded snapshot is untouched
+    assert before.officials[0].name != "Edited Outside The App"
+    assert len(before.officials) > 3
+
+
+def test_reload_keeps_mounted_officials(game_service):
+    game_service.mount_officials("pack", [make_official("m1", "Mounted One")])
+    game_service.load_officials()
+    assert "m1" in game_service.catalog.by_id
+    assert game_service.search_officials("mounted")[0]["id"] == "m1"
+
+
+def test_own_saves_are_not_reloaded(game_service):
+    watcher = CatalogWatcher(game_service.officials_file, lambda: game_service.catalog_file_signature,
+                             game_service.load_officials)
+    game_service.add_official("Greg Abbott", "Governor", "Texas", "photos/a.jpg")
+    assert not watcher.check()
+
+
+def test_reload_during_save_keeps_the_edit(game_service, monkeypatch):
+    save = game_service.save_officials
+    saving = threading.Event()
+
+    def slow_save():
+        # The new snapshot is published but officials.json is still the old file
+        saving.set()
+        time.sleep(0.2)
+        save()
+
+    monkeypatch.setattr(game_service, "save_officials", slow_save)
+    writer = threading.Thread(
+        target=game_service.add_official, args=("New Person", "Governor", "Texas", "photos/new.jpg")
+    )
+    writer.start()
+    assert saving.wait(5)
+    game_service.load_officials()
+    writer.join()
+    monkeypatch.undo()
+
+    assert "New Person" in [o.name for o in game_service.officials]
+    game_service.add_official("Another Person", "Governor", "Texas", "photos/another.jpg")
+    with open(game_service.officials_file) as f:
+        saved = [official["name"] for official in json.load(f)["officials"]]
+    assert "New Person" in saved and "Another Person" in saved
@@ -0,0 +1,110 @@
+"""Tests for game sessions and buzzer arbitration"""
+
+import threading
+
+import pytest
+
+
+def test_duplicate_player_names_are_rejected(game_service):
+    with pytest.raises(ValueError, match="unique"):
+        game_service.setup_game(["Bob", "Bob", "Al"], buzzer_mode=True)
+
+
+def test_buzzer_question_closes_when_everyone_misses(game_service):
+    game_service.setup_game(["Bob", "Al"], buzzer_mode=True)
+    question = game_service.generate_question("multiple_choice")
+
+    first = game_service.answer_question("wrong", "Bob", question.question_id)
+    assert not first["question_closed"]
+    assert game_service.answer_question("wrong", "Bob", question.question_id)["message"] == "Already answered this question"
+
+    last = game_service.answer_question("wrong", "Al", question.question_id)
+    assert last["question_closed"] and last["winner"] is None
+    assert game_service.current_question is None
+
+
+def test_answers_for_a_closed_question_are_rejected(game_service):
+    game_service.setup_game(["Bob", "Al"], buzzer_mode=True)
+    first = game_service.generate_question("multiple_choice")
+    game_service.answer_question(first.correct_answer, "Bob", first.question_id)
+    assert game_service.current_question is None
+
+    # A buzz still in flight for the first question must not land on the second
+    second = game_service.generate_question("multiple_choice")
+    assert second.question_id > first.question_id
+    stale = game_service.answer_question(first.correct_answer, "Al", first.question_id)
+    assert stale == {"success": False, "message": "Question is no longer open"}
+    assert not second.buzzes
+
+    scores = {row["name"]: row["score"] for row in game_service.get_leaderboard()}
+    assert scores == {"Bob": first.points, "Al": 0}
+
+
+def test_single_buzzer_winner_under_threads(game_service):
+    players = [f"Player {i}" for i in range(64)]
+    for _ in range(5):
+        game_service.setup_game(players, buzzer_mode=True)
+        question = game_service.generate_question("multiple_choice")
+        start = threading.Barrier(len(players))
+        results = {}
+
+        def buzz(name):
+            start.wait()
+            # Every third player knows the answer
+            answer = question.correct_answer if int(name.split()[1]) % 3 == 0 else "wrong"
+            results[name] = game_service.answer_question(answer, name, question.question_id)
+
+        threads = [threading.Thread(target=buzz, args=(name,)) for name in players]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        winners = [result["winner"] for result in results.values() if result.get("winner")]
+        assert len(winners) == 1
+        correct = [(result["sequence"], name) for name, result in results.items()
+                   if result.get("success") and result["correct"]]
+        assert correct == [min(correct)] and correct[0][1] == winners[0]
+
+        # Buzzes were scored in arrival order
+        stamps = [(entry["sequence"], entry["received_at"]) for entry in question.buzzes.values()]
+        assert stamps == sorted(stamps)
+        assert [stamp for _, stamp in stamps] == sorted(stamp for _, stamp in stamps)
+        assert not game_service.arrivals
+
+        scores = {row["name"]: row["score"] for row in game_service.get_leaderboard()}
+        assert scores[winners[0]] == question.points
+        assert sum(scores.values()) == question.points
+
+
+def test_end_game_reports_results(game_service):
+    game_service.setup_game(["Bob", "Al"])
+    question = game_service.generate_question("multiple_choice")
+    game_service.answer_question(question.correct_answer, "Bob", question.question_id)
+
+    finished = []
+    summary = game_service.end_game(on_finished=finished.append)
+
+    assert finished == [summary]
+    assert summary["winner"]["name"] == "Bob"
+    assert summary["total_questions"] == 1
+    assert summary["official_results"] == [
+        {"official_id": question.official.id, "name": question.official.name, "asked": 1, "correct": 1}
+    ]
+    assert game_service.end_game(on_finished=finished.append) and len(finished) == 1
+
+
+def test_no_winner_without_questions_points_or_outright_lead(game_service):
+    game_service.setup_game(["Bob", "Al"])
+    assert game_service.end_game()["winner"] is None
+
+    game_service.setup_game(["Bob", "Al"])
+    question = game_service.generate_question("multiple_choice")
+    game_service.answer_question("wrong", "Bob", question.question_id)
+    assert game_service.end_game()["winner"] is None
+
+    game_service.setup_game(["Bob", "Al"], buzzer_mode=True)
+    for name in ("Bob", "Al"):
+        question = game_service.generate_question("multiple_choice")
+        game_service.answer_question(question.correct_answer, name, question.question_id)
+    assert game_service.end_game()["winner"] is None
@@ -0,0 +1,84 @@
+"""Tests for official validation and photo handling"""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.services.official_service import OfficialService
+
+
+@pytest.fixture
+def official_service(data_dir):
+    return OfficialService(data_dir=data_dir)
+
+
+def test_validation_requires_core_fields(official_service):
+    result = official_service.validate_official_data({"name": "Greg Abbott", "position": " "})
+    assert not result["valid"]
+    assert result["errors"] == ["position is required", "state is required"]
+
+
+def test_validation_requires_boolean_is_fake(official_service):
+    record = {"name": "Greg Abbott", "position": "Governor", "state": "Texas", "category": "governor"}
+    assert official_service.validate_official_data({**record, "is_fake": False})["valid"]
+    assert official_service.validate_official_data({**record, "is_fake": "no"})["errors"] == [
+        "is_fake must be true or false"
+    ]
+
+
+def encoded(size, mode="RGB", image_format="PNG") -> io.BytesIO:
+    data = io.BytesIO()
+    Image.new(mode, size).save(data, image_format)
+    data.seek(0)
+    return data
+
+
+def test_save_photo_downsizes_to_jpeg(official_service):
+    path = official_service.save_photo(encoded((1600, 900)), "wide.jpg")
+    with Image.open(os.path.join(official_service.data_dir, path)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (800, 450)
+
+
+@pytest.mark.filterwarnings("ignore::PIL.Image.DecompressionBombWarning")
+@pytest.mark.parametrize("size", [(20000, 10000), (10000, 10000)])
+def test_save_photo_rejects_decompression_bombs(official_service, size):
+    # 1-bit PNGs this large are only a few kB on the wire
+    with pytest.raises(ValueError, match="too large"):
+        official_service.save_photo(encoded(size, mode="1"), "bomb.png")
+    assert os.listdir(official_service.photos_dir) == []
+
+
+def test_save_photo_rejects_non_images(official_service):
+    with pytest.raises(ValueError, match="Unsupported or corrupt image"):
+        official_service.save_photo(io.BytesIO(b"<?php echo 'hi'; ?>" * 100), "shell.jpg")
+    assert os.listdir(official_service.photos_dir) == []
+
+
+class OneWayStream(io.RawIOBase):
+    """A request body that can only be read forwards"""
+
+    def __init__(self, data: bytes):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def test_save_photo_buffers_one_way_streams(official_service):
+    path = official_service.save_photo(OneWayStream(encoded((64, 64)).getvalue()), "stream.png")
+    assert os.path.exists(os.path.join(official_service.data_dir, path))
+
+
+def test_save_photo_enforces_upload_cap(official_service, monkeypatch):
+    import app.services.official_service as official_module
+    monkeypatch.setattr(official_module, "MAX_UPLOAD_BYTES", 10)
+    with pytest.raises(ValueError, match="upload limit"):
+        official_service.save_photo(encoded((64, 64)), "big.png")
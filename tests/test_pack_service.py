@@ -0,0 +1,167 @@
+"""Tests for game packs and how their officials join the catalog"""
+
+import io
+import json
+import os
+import zipfile
+from dataclasses import replace
+
+import pytest
+from PIL import Image
+
+from app.services.official_service import OfficialService
+from app.services.pack_service import PackService, MAX_CATALOG_BYTES
+from conftest import make_official
+
+
+def mount(game_service, pack_id, count, category="governor"):
+    officials = [make_official(f"{pack_id}_{i}", f"Mounted {i}", category=category) for i in range(count)]
+    return game_service.mount_officials(pack_id, officials)
+
+
+def test_mounted_officials_are_read_only(game_service):
+    before = game_service.get_catalog_stats()
+    mount(game_service, "pack", 2)
+
+    with pytest.raises(ValueError, match="read-only"):
+        game_service.update_official("pack_0", category="mayor")
+
+    game_service.unmount_officials("pack")
+    assert game_service.get_catalog_stats() == before
+
+
+def test_generated_ids_stay_unique_across_unmount(game_service):
+    size = len(game_service.officials)
+    mount(game_service, "pack", 2)
+    first = game_service.add_official("A", "Governor", "Texas", "photos/a.jpg")
+    game_service.unmount_officials("pack")
+    later = [game_service.add_official(name, "Governor", "Texas", "photos/a.jpg") for name in "BC"]
+
+    ids = [first] + later
+    assert len(set(ids)) == 3
+    assert len(game_service.officials) == len(game_service.search_index) == size + 3
+
+
+def test_import_skips_known_records_and_renames_clashing_ids(game_service):
+    existing = game_service.officials[0]
+    clash = make_official(existing.id, "Someone Else")
+
+    added = game_service.import_officials([existing, clash])
+
+    assert added == 1
+    assert game_service.catalog.by_id[existing.id] == existing
+    assert game_service.catalog.by_id[f"{existing.id}_2"].name == "Someone Else"
+
+
+def test_import_pack_never_overwrites_photos(tmp_path):
+    def library(name, color):
+        official_service = OfficialService(data_dir=str(tmp_path / name))
+        Image.new("RGB", (40, 40), color).save(os.path.join(official_service.photos_dir, "face.jpg"))
+        return official_service, PackService(official_service)
+
+    source_service, source = library("source", "red")
+    target_service, target = library("target", "blue")
+    official = make_official("tx_gov", "Greg Abbott")
+    source.export_pack("texas", [replace(official, photo_path="photos/face.jpg")])
+    os.replace(source.pack_path("texas"), target.pack_path("texas"))
+
+    imported, = target.import_pack("texas")
+    assert imported.photo_path == "photos/face_1.jpg"
+    assert sorted(os.listdir(target_service.photos_dir)) == ["face.jpg", "face_1.jpg"]
+    with Image.open(os.path.join(target_service.photos_dir, "face.jpg")) as image:
+        assert image.getpixel((0, 0))[2] > 200
+
+    # Importing the same pack again reuses the copy it already made
+    again, = target.import_pack("texas")
+    assert again.photo_path == "photos/face_1.jpg"
+    assert len(os.listdir(target_service.photos_dir)) == 2
+
+
+def jpeg_bytes(color="red") -> bytes:
+    data = io.BytesIO()
+    Image.new("RGB", (40, 40), color).save(data, "JPEG")
+    return data.getvalue()
+
+
+def write_pack(pack_service, pack_id, rows, members, compression=zipfile.ZIP_STORED):
+    fields = ["id", "name", "position", "state", "photo_path", "category", "is_fake"]
+    with zipfile.ZipFile(pack_service.pack_path(pack_id), "w", compression=compression) as archive:
+        archive.writestr("pack.json", json.dumps({"format": 1}))
+        archive.writestr("catalog.json", json.dumps({"fields": fields, "rows": rows}))
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+@pytest.fixture
+def pack_service(data_dir):
+    return PackService(OfficialService(data_dir=data_dir))
+
+
+def test_import_pack_only_accepts_verified_photos(pack_service):
+    write_pack(pack_service, "hostile", [
+        ["ok", "Greg Abbott", "Governor", "Texas", "photos/ok.html", "governor", False],
+        ["xss", "Eve Script", "Governor", "Texas", "photos/x.html", "governor", False],
+        ["missing", "No Photo", "Governor", "Texas", "photos/none.jpg", "governor", False],
+    ], {"photos/ok.html": jpeg_bytes(), "photos/x.html": b"<script>alert(1)</script>"})
+
+    imported = pack_service.import_pack("hostile")
+
+    assert [(o.id, o.photo_path) for o in imported] == [("ok", "photos/ok.jpg")]
+    assert os.listdir(pack_service.photos_dir) == ["ok.jpg"]
+
+
+def test_pack_rows_are_validated(pack_service):
+    write_pack(pack_service, "rows", [
+        ["good", "Greg Abbott", "Governor", "Texas", "photos/a.jpg", "governor", False],
+        ["fake", "Not Bool", "Governor", "Texas", "photos/a.jpg", "governor", "no"],
+        ["state", "Bad State", "Governor", "Atlantis", "photos/a.jpg", "governor", False],
+        [None, "No Id", "Governor", "Texas", "photos/a.jpg", "governor", False],
+    ], {"photos/a.jpg": jpeg_bytes()})
+
+    assert [o.id for o in pack_service.import_pack("rows")] == ["good"]
+
+
+def test_oversized_catalog_is_refused_before_inflating(pack_service):
+    padding = " " * (MAX_CATALOG_BYTES + 1)
+    with zipfile.ZipFile(pack_service.pack_path("bomb"), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("pack.json", json.dumps({"format": 1}))
+        archive.writestr("catalog.json", '{"fields": [], "rows": []}' + padding)
+
+    with pytest.raises(ValueError, match="too large"):
+        pack_service.import_pack("bomb")
+
+
+def test_mounted_pack_serves_only_catalog_photos(pack_service):
+    write_pack(pack_service, "mounted", [
+        ["ok", "Greg Abbott", "Governor", "Texas", "photos/a.png", "governor", False],
+        ["xss", "Eve Script", "Governor", "Texas", "photos/x.html", "governor", False],
+    ], {"photos/a.png": jpeg_bytes(), "photos/x.html": b"<script>alert(1)</script>"})
+
+    officials = pack_service.mount_pack("mounted")
+
+    assert officials[0].photo_path == "packs/mounted/photos/a.png"
+    data, mimetype = pack_service.read_photo("mounted", "photos/a.png")
+    assert mimetype == "image/jpeg" and data == jpeg_bytes()
+    assert pack_service.read_photo("mounted", "photos/x.html") is None
+    assert pack_service.read_photo("mounted", "catalog.json") is None
+
+
+def test_save_upload_streams_to_disk_with_a_cap(pack_service, monkeypatch):
+    from werkzeug.datastructures import FileStorage
+    import app.services.pack_service as pack_module
+
+    write_pack(pack_service, "source", [], {})
+    with open(pack_service.pack_path("source"), "rb") as f:
+        data = f.read()
+
+    path = pack_service.save_upload(FileStorage(io.BytesIO(data), "copy.pack"), "copy")
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+    monkeypatch.setattr(pack_module, "MAX_PACK_BYTES", len(data) - 1)
+    with pytest.raises(ValueError, match="upload limit"):
+        pack_service.save_upload(FileStorage(io.BytesIO(data), "big.pack"), "big")
+    assert not any(name.startswith("big") for name in os.listdir(pack_service.packs_dir))
+
+    with pytest.raises(ValueError, match="Not a game pack"):
+        pack_service.save_upload(FileStorage(io.BytesIO(b"not a zip"), "junk.pack"), "junk")
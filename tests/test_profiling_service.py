@@ -0,0 +1,86 @@
+"""Tests for request profiling and the profile ring"""
+
+import marshal
+from collections import Counter
+
+import pytest
+
+from app.services.profiling_service import ProfilingService
+
+
+def capture(profiling, path="/api/game/question", header="1", status=200):
+    active = profiling.start("POST", path, header)
+    return profiling.finish(active, status) if active else None
+
+
+def test_header_and_toggle_decide_what_is_profiled():
+    profiling = ProfilingService()
+    assert profiling.start("GET", "/api/game/question", None) is None
+    assert profiling.start("GET", "/api/game/question", "off") is None
+
+    assert capture(profiling, header="sample").mode == "sample"
+    assert capture(profiling, path="/anything", header="yes").mode == "cprofile"
+
+    profiling.configure(enabled=True, routes=["/api/game/*"], mode="sample")
+    assert capture(profiling, path="/api/game/answer", header=None).mode == "sample"
+    assert profiling.start("GET", "/api/admin/search", None) is None
+
+    with pytest.raises(ValueError):
+        profiling.configure(mode="perf")
+
+
+def test_ring_keeps_newest_profiles():
+    profiling = ProfilingService(ring_size=3)
+    ids = [capture(profiling, header="sample").id for _ in range(5)]
+
+    assert [summary["id"] for summary in profiling.list_profiles()] == ids[:1:-1]
+    assert profiling.get_profile(ids[0]) is None
+    assert profiling.get_profile(ids[-1]).status == 200
+
+
+def test_one_cprofile_capture_at_a_time():
+    profiling = ProfilingService()
+    first = profiling.start("GET", "/a", "cprofile")
+    second = profiling.start("GET", "/b", "cprofile")
+    assert (first.record.mode, second.record.mode) == ("cprofile", "sample")
+
+    profiling.finish(second)
+    profiling.finish(first)
+    assert capture(profiling, header="cprofile").mode == "cprofile"
+
+
+def test_cprofile_exports():
+    profiling = ProfilingService()
+    active = profiling.start("GET", "/work", "cprofile")
+    sorted(range(1000), key=lambda value: -value)
+    record = profiling.finish(active)
+
+    assert marshal.loads(profiling.to_pstats(record)) == record.stats
+    assert "function calls" in profiling.top_functions(record)
+
+
+def test_collapsed_stacks_follow_the_caller_graph():
+    main, helper, leaf = ("app.py", 1, "main"), ("app.py", 10, "helper"), ("app.py", 20, "leaf")
+    profiling = ProfilingService()
+    record = capture(profiling, header="sample")
+    record.mode = "cprofile"
+    # (primitive calls, calls, own time, cumulative time, callers) as cProfile records them
+    record.stats = {
+        main: (1, 1, 0.001, 0.006, {}),
+        helper: (2, 2, 0.002, 0.005, {main: (2, 2, 0.002, 0.005)}),
+        leaf: (2, 2, 0.003, 0.003, {helper: (2, 2, 0.003, 0.003)}),
+    }
+
+    lines = dict(line.rsplit(" ", 1) for line in profiling.to_collapsed(record).splitlines())
+    assert lines == {
+        "main (app.py:1)": "1000",
+        "main (app.py:1);helper (app.py:10)": "2000",
+        "main (app.py:1);helper (app.py:10);leaf (app.py:20)": "3000",
+    }
+
+
+def test_collapsed_samples():
+    profiling = ProfilingService()
+    record = capture(profiling, header="sample")
+    record.stacks = Counter({"main;helper": 3, "main": 1})
+    assert profiling.to_collapsed(record) == "main;helper 3\nmain 1\n"
@@ -0,0 +1,80 @@
+"""Tests for the in-memory search index"""
+
+from dataclasses import replace
+
+from app.services.search_service import SearchIndex, MAX_PREFIX_EXPANSIONS
+from conftest import make_official
+
+
+def names(results):
+    return [official.name for official, _ in results]
+
+
+def build(*officials):
+    index = SearchIndex()
+    index.rebuild(officials)
+    return index
+
+
+def test_prefix_search_ranks_name_hits_first():
+    index = build(
+        make_official("a", "Greg Abbott", fun_fact="Governor of Texas"),
+        make_official("b", "Kathy Hochul", state="New York", fun_fact="Greg was not her running mate"),
+    )
+    assert names(index.search("gre")) == ["Greg Abbott", "Kathy Hochul"]
+    assert names(index.search("greg hoc")) == ["Kathy Hochul"]
+    assert index.search("nobody") == []
+
+
+def test_add_update_remove():
+    index = build(make_official("a", "Greg Abbott"))
+    index.add(make_official("b", "Gavin Newsom", state="California"))
+    assert names(index.search("ga")) == ["Gavin Newsom"]
+
+    index.update(make_official("b", "Gretchen Whitmer", state="Michigan"))
+    assert names(index.search("ga")) == []
+    assert sorted(names(index.search("gre"))) == ["Greg Abbott", "Gretchen Whitmer"]
+    assert "gavin" not in index.postings and "gavin" not in index.vocabulary
+
+    index.remove("a")
+    assert names(index.search("gre")) == ["Gretchen Whitmer"]
+    assert len(index) == 1
+
+
+def test_copy_leaves_original_untouched():
+    abbott = make_official("a", "Greg Abbott")
+    original = build(abbott, make_official("b", "Gavin Newsom", state="California"))
+
+    clone = original.copy()
+    clone.add(make_official("c", "Greg Gianforte", state="Montana"))
+    clone.update(replace(abbott, name="Gregory Abbott"))
+    clone.remove("b")
+
+    assert sorted(names(original.search("gre"))) == ["Greg Abbott"]
+    assert names(original.search("gavin")) == ["Gavin Newsom"]
+    assert "gregory" not in original.vocabulary and "gianforte" not in original.postings
+    assert len(original) == 2
+
+    assert sorted(names(clone.search("gre"))) == ["Greg Gianforte", "Gregory Abbott"]
+    assert clone.search("gavin") == []
+    assert len(clone) == 2
+
+
+def test_copy_of_copy_is_independent():
+    first = build(make_official("a", "Greg Abbott"))
+    second = first.copy()
+    second.add(make_official("b", "Greg Gianforte", state="Montana"))
+    third = second.copy()
+    third.remove("a")
+
+    assert len(names(second.search("greg"))) == 2
+    assert names(third.search("greg")) == ["Greg Gianforte"]
+    assert names(first.search("greg")) == ["Greg Abbott"]
+
+
+def test_broad_prefix_is_bounded():
+    index = build(*(make_official(f"o{i}", f"Official {i}") for i in range(MAX_PREFIX_EXPANSIONS * 4)))
+    assert len(index._prefix_tokens("1")) <= MAX_PREFIX_EXPANSIONS
+    # An exact token is always part of the expansion
+    assert index.search("1")[0][0].name == "Official 1"
+    assert index.search("1 2") == []